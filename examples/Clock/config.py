@@ -0,0 +1,26 @@
+# Import the service class from your WeLD project
+# import will also work when this is in ~/.config/weld/ though lsp might not resolve it
+from weld.services.ClockService import ClockService
+from weld.type import UpdateStrategy
+
+config = {
+    "title": "clock-widget",
+    "layer": "top",
+    "anchors": ["top", "right"],
+    "top": 10,
+    "right": 10,
+    "focus": "none",
+    "transparency": True,
+    "syncDimension": True,
+}
+
+states = [
+    {
+        "event": "clock",
+        "updateStrategy": UpdateStrategy.SERVICE,
+        "service_factory": ClockService,
+        "service_arguments": {
+            "formats": {"time": "%H:%M:%S", "date": "%A, %d %B %Y"},
+        },
+    }
+]
@@ -0,0 +1,24 @@
+# Import the service class from your WeLD project
+# import will also work when this is in ~/.config/weld/ though lsp might not resolve it
+from weld.services.ProcessTableService import ProcessTableService
+from weld.type import UpdateStrategy
+
+config = {
+    "title": "process-widget",
+    "layer": "top",
+    "anchors": ["top", "right"],
+    "top": 10,
+    "right": 10,
+    "focus": "on_demand",
+    "transparency": True,
+    "syncDimension": True,
+}
+
+states = [
+    {
+        "event": "processes",
+        "updateStrategy": UpdateStrategy.SERVICE,
+        "service_factory": ProcessTableService,
+        "service_arguments": {"count": 10, "interval": 2000, "sortBy": "cpu"},
+    }
+]
@@ -0,0 +1,28 @@
+# Import the service class from your WeLD project
+# import will also work when this is in ~/.config/weld/ though lsp might not resolve it
+from weld.services.SystemMetricsService import SystemMetricsService
+from weld.type import UpdateStrategy
+
+config = {
+    "title": "metrics-widget",
+    "layer": "top",
+    "anchors": ["top", "right"],
+    "top": 10,
+    "right": 10,
+    "focus": "none",
+    "transparency": True,
+    "syncDimension": True,
+}
+
+states = [
+    {
+        "event": "metrics",
+        "updateStrategy": UpdateStrategy.SERVICE,
+        "service_factory": SystemMetricsService,
+        "service_arguments": {
+            # metric -> sampling interval in ms, leave out what you don't show
+            "metrics": {"cpu": 1000, "memory": 2000, "network": 1000, "disk": 30000},
+            "disks": ["/"],
+        },
+    }
+]
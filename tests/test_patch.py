@@ -0,0 +1,129 @@
+import importlib.util
+import os
+
+import pytest
+
+# Load the module on its own, weld.utils imports GTK
+_spec = importlib.util.spec_from_file_location(
+    "weld_patch",
+    os.path.join(os.path.dirname(__file__), "..", "weld", "utils", "patch.py"),
+)
+patch = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(patch)
+diff = patch.diff
+
+
+def apply(value, ops):
+    """Apply ops the way web/state.js does."""
+    for op in ops:
+        kind, path = op[0], op[1]
+        if not path:
+            value = op[2]
+            continue
+        parent = value
+        for key in path[:-1]:
+            parent = parent[key]
+        key = path[-1]
+        if kind == "remove":
+            del parent[key]
+        elif kind == "add" and isinstance(parent, list):
+            parent.insert(key, op[2])
+        else:
+            parent[key] = op[2]
+    return value
+
+
+def check(old, new):
+    ops = diff(old, new)
+    assert apply(_copy(old), ops) == new
+    return ops
+
+
+def _copy(value):
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+def test_identical_values_give_no_ops():
+    value = {"a": [1, 2, {"b": None}], "c": "x"}
+    assert diff(value, _copy(value)) == []
+
+
+def test_nested_add():
+    old = {"net": {"wifi": {"ssid": "home"}}}
+    new = {"net": {"wifi": {"ssid": "home", "strength": 70}}}
+    assert check(old, new) == [["add", ["net", "wifi", "strength"], 70]]
+
+
+def test_nested_remove():
+    old = {"net": {"wifi": {"ssid": "home", "strength": 70}}}
+    new = {"net": {"wifi": {"ssid": "home"}}}
+    assert check(old, new) == [["remove", ["net", "wifi", "strength"]]]
+
+
+def test_nested_replace():
+    old = {"cpu": {"total": 10.5, "cores": [1, 2]}, "load": 1}
+    new = {"cpu": {"total": 12.0, "cores": [1, 2]}, "load": 1}
+    assert check(old, new) == [["replace", ["cpu", "total"], 12.0]]
+
+
+def test_type_change_is_a_replace():
+    # True == 1, but the page must see the new type
+    assert check({"a": 1}, {"a": True}) == [["replace", ["a"], True]]
+    assert check({"a": [1]}, {"a": {"0": 1}}) == [["replace", ["a"], {"0": 1}]]
+
+
+def test_list_grow():
+    assert check([1, 2, 3, 4], [1, 2, 3, 4, 5, 6]) == [
+        ["add", [4], 5],
+        ["add", [5], 6],
+    ]
+
+
+def test_list_shrink_removes_from_the_back():
+    assert check([1, 2, 3, 4, 5, 6], [1, 2, 3, 4]) == [
+        ["remove", [5]],
+        ["remove", [4]],
+    ]
+
+
+def test_list_grow_and_change_in_a_dict():
+    old = {"history": [{"id": 1}], "count": 1, "dnd": False}
+    new = {"history": [{"id": 1}, {"id": 2}], "count": 2, "dnd": False}
+    assert check(old, new) == [
+        ["add", ["history", 1], {"id": 2}],
+        ["replace", ["count"], 2],
+    ]
+
+
+def test_too_many_ops_fall_back_to_replace():
+    # two replaces and a remove for a list of two
+    assert check([1, 2, 3], [4, 5]) == [["replace", [], [4, 5]]]
+
+
+def test_fallback_of_a_nested_container():
+    old = {"items": [1, 2, 3], "a": 1, "b": 2, "c": 3}
+    new = {"items": [4, 5], "a": 1, "b": 2, "c": 3}
+    assert check(old, new) == [["replace", ["items"], [4, 5]]]
+
+
+def test_fallback_at_the_root():
+    assert check({"a": 1, "b": 2}, {"c": 3}) == [["replace", [], {"c": 3}]]
+
+
+@pytest.mark.parametrize(
+    "old, new",
+    [
+        ([], [1]),
+        ([1], []),
+        ({"a": [{"b": 1}, {"c": 2}]}, {"a": [{"b": 1}, {"c": 3}, {"d": 4}]}),
+        ({"a": {"b": {"c": {"d": 1}}}}, {"a": {"b": {"c": {}}}}),
+        ("text", "other"),
+        (None, {"a": 1}),
+    ],
+)
+def test_ops_turn_old_into_new(old, new):
+    check(old, new)
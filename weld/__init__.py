@@ -1,14 +1,17 @@
+import argparse
 import signal
 
-from .core.widget import BaseWebView  # Assuming this is your BaseWebView import
-from .gi_modules import GLib, Gtk
 from .log import log_info, setup_logger
+from .profiler import profiler
 
 
 def shutdown_handler(base_view_instance):
+    from .gi_modules import GLib, Gtk
+
     log_info("Shutdown signal received. Cleaning up widgets...")
     for widget in list(base_view_instance.widgets.values()):
         widget.close()
+    base_view_instance.webview_pool.close()
 
     Gtk.main_quit()
 
@@ -16,9 +19,37 @@ def shutdown_handler(base_view_instance):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="WeLD daemon")
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Apply edits of widget files without restarting the widgets",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Log the wall time of each startup phase",
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        help="WebViews kept ready for new widgets, 0 disables the pool",
+    )
+    args = parser.parse_args()
+
     setup_logger()
+    if args.profile_startup:
+        profiler.enable()
     log_info("Starting WeLD...")
-    base_view = BaseWebView()
+    # Imported here so that `weld.cli` and `weld.constants` users don't load
+    # GTK and WebKit
+    from .core.widget import BaseWebView
+    from .gi_modules import GLib, Gtk
+
+    profiler.mark("imports")
+    base_view = BaseWebView(watch=args.watch, pool_size=args.pool_size)
+    profiler.mark("base view")
+    base_view.preload_widgets()
     GLib.unix_signal_add(
         GLib.PRIORITY_DEFAULT, signal.SIGINT, shutdown_handler, base_view
     )
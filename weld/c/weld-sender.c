@@ -4,11 +4,30 @@
 #include <sys/un.h>
 #include <unistd.h>
 
+static int usage(const char *name) {
+    fprintf(stderr, "Usage: %s [--show|--hide|--toggle] <widget_name> [event_name]\n",
+            name);
+    return 1;
+}
+
 int main(int argc, char *argv[]) {
-    if (argc != 3) {
-        fprintf(stderr, "Usage: %s <widget_name> <event_name>\n", argv[0]);
-        return 1;
+    /* Without a flag the event is sent, with one the event is optional */
+    const char *action = "send";
+    int first = 1;
+    if (argc > 1 && strncmp(argv[1], "--", 2) == 0) {
+        action = argv[1] + 2;
+        if (strcmp(action, "show") != 0 && strcmp(action, "hide") != 0 &&
+            strcmp(action, "toggle") != 0) {
+            return usage(argv[0]);
+        }
+        first = 2;
     }
+    int rest = argc - first;
+    if (rest < 1 || rest > 2 || (rest == 1 && strcmp(action, "send") == 0)) {
+        return usage(argv[0]);
+    }
+    const char *widget = argv[first];
+    const char *event = rest == 2 ? argv[first + 1] : NULL;
 
     int sock = socket(AF_UNIX, SOCK_STREAM, 0);
     if (sock == -1) {
@@ -28,10 +47,15 @@ int main(int argc, char *argv[]) {
     }
 
     char msg[256];
-    snprintf(
-        msg, sizeof(msg),
-        "{\"action\": \"send\", \"widget\": \"%s\", \"bind_event\": \"%s\"}",
-        argv[1], argv[2]);
+    if (event != NULL) {
+        snprintf(
+            msg, sizeof(msg),
+            "{\"action\": \"%s\", \"widget\": \"%s\", \"bind_event\": \"%s\"}",
+            action, widget, event);
+    } else {
+        snprintf(msg, sizeof(msg), "{\"action\": \"%s\", \"widget\": \"%s\"}",
+                 action, widget);
+    }
 
     if (send(sock, msg, strlen(msg), 0) == -1) {
         perror("send");
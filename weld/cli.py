@@ -29,6 +29,16 @@ def send_command(action, widget_name=None, bind_event=None):
         return None
 
 
+def validate(widget_name=None):
+    """Compile and validate widget configs locally, no daemon needed."""
+    from weld.constants import WIDGET_DIR
+    from weld.core.config_cache import validate_widgets
+
+    lines = validate_widgets(WIDGET_DIR, [widget_name] if widget_name else None)
+    print("\n".join(lines))
+    sys.exit(0 if all(line.endswith(": ok") for line in lines) else 1)
+
+
 def main():
     parser = argparse.ArgumentParser(description="WeLD CLI Tool")
     parser.add_argument(
@@ -44,14 +54,20 @@ def main():
     parser.add_argument(
         "bind_event",
         nargs="?",
-        help="Additional data to send with the command (optional)",
+        help="Event to dispatch, for 'send' and optionally 'show' or 'toggle'",
     )
 
     args = parser.parse_args()
 
-    if args.action not in ["list", "listactive"] and not args.widget:
+    if (
+        args.action not in ["list", "listactive", "schedule", "stats", "validate"]
+        and not args.widget
+    ):
         parser.error(f"The '{args.action}' action requires a widget name.")
 
+    if args.action == CliOptions.VALIDATE:
+        validate(args.widget)
+
     response = send_command(args.action, args.widget, args.bind_event)
 
     if response:
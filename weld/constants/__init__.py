@@ -4,23 +4,45 @@ from importlib.resources import files
 
 PATH_TO_INTERPETER = sys.executable
 CONFIG_FILE = "config.py"
+# Empty file in a widget directory: create the widget hidden at daemon start
+PRELOAD_FILE = ".preload"
 
 XDG_CONFIG_HOME: str = os.getenv("XDG_CONFIG_HOME", os.path.expanduser("~/.config"))
+XDG_CACHE_HOME: str = os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))
 XDG_DATA_DIRS: str = os.getenv(
     "XDG_DATA_DIRS",
     "/usr/local/share/:/usr/share/",
 )
 WIDGET_DIR: str = os.path.join(XDG_CONFIG_HOME, "weld")
+CONFIG_CACHE_DIR: str = os.path.join(XDG_CACHE_HOME, "weld", "configs")
 SOCKET_PATH: str = "/tmp/weld.sock"
 TEXT_ENCODING: str = "utf-8"
 SOURCE_HTML: str = "index.html"
+STREAM_SCHEME: str = "weld-stream"
+STREAM_BATCH_MS: int = 0  # default line batching window, 0 = one batch per read
+COMMAND_TIMEOUT_MS: int = 30000  # kill commands that set no timeoutMs after this
 SCRIPT_MESSAGE_HANDLER: str = "pybridge"
 SCRIPT_MESSAGE_RECEIVED_SIGNAL: str = (
     f"script-message-received::{SCRIPT_MESSAGE_HANDLER}"
 )
+WELD_BIND: str = os.path.join(XDG_CONFIG_HOME, "hypr", "weld.conf")
 
+# Web injection files, read on first access
+_WEB_RESOURCES = {
+    "SYNC_DIMENSIONS_JS": "syncDimensions.js",
+    "INPUT_MASK_JS": "inputMask.js",
+    "STATE_JS": "state.js",
+    "RELOAD_CSS_JS": "reloadCss.js",
+}
+SYNC_DIMENSIONS_JS: str
+INPUT_MASK_JS: str
+STATE_JS: str
+RELOAD_CSS_JS: str
 
-# Web injection files
-SYNC_DIMENSIONS_JS: str = files("weld.web").joinpath("syncDimensions.js").read_text()
-INPUT_MASK_JS: str = files("weld.web").joinpath("inputMask.js").read_text()
-WELD_BIND: str = os.path.join(XDG_CONFIG_HOME, "hypr", "weld.conf")
+
+def __getattr__(name: str) -> str:
+    if name in _WEB_RESOURCES:
+        value = files("weld.web").joinpath(_WEB_RESOURCES[name]).read_text()
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,4 +1,14 @@
-from .widget import BaseWebView, WidgetWindow
+import importlib
+
+# The widget stack loads GTK and WebKit, it is imported on first use
+_LAZY = {"WidgetWindow": ".widget", "BaseWebView": ".widget"}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        return getattr(importlib.import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "WidgetWindow",
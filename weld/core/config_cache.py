@@ -0,0 +1,157 @@
+import hashlib
+import importlib.util
+import marshal
+import os
+from types import CodeType
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from pydantic import ValidationError
+
+from ..constants import CONFIG_CACHE_DIR, CONFIG_FILE
+from ..log import log_debug, log_error, log_warning
+from ..profiler import profiler
+from ..type import Config, State
+
+LoadedConfig = Tuple[Config, List[State], list]
+
+
+class _Entry(NamedTuple):
+    mtime_ns: int
+    size: int
+    digest: str
+    loaded: LoadedConfig
+
+
+class ConfigCache:
+    """
+    Compiled and validated widget configs.
+
+    A config.py whose mtime and size are unchanged is not even read again;
+    one whose content hash is unchanged (e.g. after a `touch`) is not
+    executed or validated again. Either way the previously validated models
+    are returned, with `allowedRoutes` already absolute, so none of the
+    modules the config imports are touched.
+
+    Compiled code is also kept on disk, keyed by content hash, so the first
+    load after a daemon start skips parsing. `weldctl validate` fills it.
+    """
+
+    def __init__(self, cache_dir: str = CONFIG_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._entries: Dict[str, _Entry] = {}
+
+    def load(self, widget_path: str, name: str) -> Optional[LoadedConfig]:
+        """
+        Return (config, states, binds) of the widget in `widget_path`.
+        Errors are logged and give None.
+        """
+        config_path = os.path.join(widget_path, CONFIG_FILE)
+        try:
+            stat = os.stat(config_path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            entry = self._entries.get(config_path)
+            if entry and (entry.mtime_ns, entry.size) == signature:
+                return entry.loaded
+            with open(config_path, "rb") as f:
+                source = f.read()
+        except FileNotFoundError:
+            log_error(f"Config file not found for {name}.")
+            return None
+
+        digest = hashlib.sha256(source).hexdigest()
+        if entry and entry.digest == digest:
+            loaded = entry.loaded
+        else:
+            with profiler.span("config exec"):
+                loaded = self._execute(
+                    self._compile(source, config_path, digest), widget_path, name
+                )
+            if loaded is None:
+                self._entries.pop(config_path, None)
+                return None
+        self._entries[config_path] = _Entry(*signature, digest, loaded)
+        return loaded
+
+    def _code_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}.bin")
+
+    def _compile(self, source: bytes, config_path: str, digest: str) -> CodeType:
+        """Compile `source`, or read the code compiled by an earlier run."""
+        code_path = self._code_path(digest)
+        try:
+            with open(code_path, "rb") as f:
+                data = f.read()
+            magic = importlib.util.MAGIC_NUMBER
+            if data.startswith(magic):
+                code = marshal.loads(data[len(magic) :])
+                if code.co_filename == config_path:
+                    log_debug(f"Using compiled {config_path}")
+                    return code
+        except (OSError, ValueError, EOFError, TypeError):
+            pass
+
+        code = compile(source, config_path, "exec")
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temporary = f"{code_path}.{os.getpid()}"
+            with open(temporary, "wb") as f:
+                f.write(importlib.util.MAGIC_NUMBER + marshal.dumps(code))
+            os.replace(temporary, code_path)
+        except OSError as e:
+            log_warning(f"Could not cache compiled {config_path}: {e}")
+        return code
+
+    def _execute(
+        self, code: CodeType, widget_path: str, name: str
+    ) -> Optional[LoadedConfig]:
+        var = {}
+        exec(code, var)
+        if "config" not in var:
+            log_error(f"Config not found for {name}.")
+            return None
+        try:
+            config = Config(**var["config"])
+            states = [State(**state) for state in var.get("states", [])]
+        except ValidationError as e:
+            log_error(f"Validation error loading config for {name}: {e}")
+            return None
+
+        config.allowedRoutes.append(widget_path)
+        for i in range(len(config.allowedRoutes)):
+            route = config.allowedRoutes[i]
+            if isinstance(route, str):
+                normalized_route = os.path.normpath(route)
+                absolute_route = os.path.abspath(normalized_route)
+                config.allowedRoutes[i] = absolute_route
+
+        return config, states, var.get("binds", [])
+
+
+config_cache = ConfigCache()
+
+
+def validate_widgets(widget_dir: str, names: Optional[List[str]] = None) -> List[str]:
+    """
+    Compile and validate the config of every widget, or of `names`.
+    Used by `weldctl validate`, this also fills the compiled code cache.
+
+    Returns:
+        list: One "name: ok" or "name: <error>" line per widget.
+    """
+    if names is None:
+        names = sorted(
+            entry
+            for entry in os.listdir(widget_dir)
+            if os.path.exists(os.path.join(widget_dir, entry, CONFIG_FILE))
+        )
+    lines = []
+    for name in names:
+        try:
+            loaded = config_cache.load(os.path.join(widget_dir, name), name)
+            lines.append(f"{name}: {'ok' if loaded else 'invalid, see the log'}")
+        except Exception as e:
+            lines.append(f"{name}: {type(e).__name__}: {e}")
+    return lines
+
+
+__all__ = ["ConfigCache", "config_cache", "validate_widgets"]
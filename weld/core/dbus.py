@@ -0,0 +1,144 @@
+from typing import Any, Callable, Dict, List, Optional
+
+from ..constants import TEXT_ENCODING
+from ..gi_modules import Gio, GLib
+from ..log import log_error, log_info, log_warning
+from ..type import BusType, DBusSource
+
+_BUS_TYPES = {
+    BusType.SESSION: Gio.BusType.SESSION,
+    BusType.SYSTEM: Gio.BusType.SYSTEM,
+}
+
+
+def _plain(value: Any) -> Any:
+    """Turn an unpacked variant into something JSON can hold."""
+    if isinstance(value, bytes):
+        return value.rstrip(b"\0").decode(TEXT_ENCODING, "replace")
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
+
+
+class DBusWatch:
+    """
+    Keeps the properties of one D-Bus object in a local cache.
+
+    The proxy is created asynchronously and follows `PropertiesChanged`, so
+    nothing is polled. Bursts of changes and signals are coalesced into a
+    single update. The update always carries the whole cache, and the delta
+    layer only sends the properties that changed to the page. When the
+    service goes away the cache is emptied, and refilled once it is back.
+    """
+
+    def __init__(self, source: DBusSource, on_update: Callable[[dict], None]):
+        self.source = source
+        self.on_update = on_update
+        self.properties: Dict[str, Any] = {}
+        self.signals: Dict[str, Dict[str, Any]] = {}
+        self._proxy: Optional[Gio.DBusProxy] = None
+        self._handler_ids: List[int] = []
+        self._cancellable = Gio.Cancellable()
+        self._flush_id: Optional[int] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.source.name}{self.source.path}"
+
+    def start(self):
+        Gio.DBusProxy.new_for_bus(
+            _BUS_TYPES[self.source.bus],
+            Gio.DBusProxyFlags.GET_INVALIDATED_PROPERTIES,
+            None,
+            self.source.name,
+            self.source.path,
+            self.source.interface,
+            self._cancellable,
+            self._on_proxy,
+        )
+
+    def _on_proxy(self, _source, result: Gio.AsyncResult):
+        try:
+            self._proxy = Gio.DBusProxy.new_for_bus_finish(result)
+        except GLib.Error as e:
+            if not e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                log_error(f"DBus proxy for {self.name} failed: {e.message}")
+            return
+        self._handler_ids = [
+            self._proxy.connect("g-properties-changed", self._on_properties),
+            self._proxy.connect("g-signal", self._on_signal),
+            self._proxy.connect("notify::g-name-owner", self._on_owner),
+        ]
+        self._reload()
+        log_info(f"Watching DBus object {self.name}")
+
+    def _wanted(self, name: str) -> bool:
+        return self.source.properties is None or name in self.source.properties
+
+    def _reload(self):
+        self.properties = {}
+        for name in self._proxy.get_cached_property_names() or []:
+            if self._wanted(name):
+                value = self._proxy.get_cached_property(name)
+                self.properties[name] = _plain(value.unpack())
+        self._schedule()
+
+    def _on_properties(self, _proxy, changed: GLib.Variant, invalidated: List[str]):
+        touched = False
+        for name, value in changed.unpack().items():
+            if self._wanted(name):
+                self.properties[name] = _plain(value)
+                touched = True
+        for name in invalidated:
+            if self._wanted(name):
+                # refetched by the proxy, reported as a change once known
+                self.properties.pop(name, None)
+                touched = True
+        if touched:
+            self._schedule()
+
+    def _on_signal(self, _proxy, _sender, signal: str, parameters: GLib.Variant):
+        if signal not in self.source.signals:
+            return
+        previous = self.signals.get(signal)
+        self.signals[signal] = {
+            "args": _plain(parameters.unpack()),
+            "count": previous["count"] + 1 if previous else 1,
+        }
+        self._schedule()
+
+    def _on_owner(self, proxy: Gio.DBusProxy, _param):
+        if proxy.get_name_owner() is None:
+            log_warning(f"DBus service of {self.name} is gone.")
+        self._reload()
+
+    def _schedule(self):
+        if self._flush_id is not None:
+            return
+        if self.source.coalesceMs <= 0:
+            self._flush()
+        else:
+            self._flush_id = GLib.timeout_add(self.source.coalesceMs, self._flush)
+
+    def _flush(self):
+        self._flush_id = None
+        self.on_update(
+            {"properties": dict(self.properties), "signals": dict(self.signals)}
+        )
+        return False
+
+    def stop(self):
+        self._cancellable.cancel()
+        if self._flush_id is not None:
+            GLib.source_remove(self._flush_id)
+            self._flush_id = None
+        if self._proxy is not None:
+            for handler_id in self._handler_ids:
+                self._proxy.disconnect(handler_id)
+            self._proxy = None
+        self._handler_ids = []
+
+
+__all__ = ["DBusWatch"]
@@ -0,0 +1,176 @@
+import os
+from typing import Callable, Optional
+
+from ..constants import TEXT_ENCODING
+from ..gi_modules import Gio, GLib
+from ..log import log_error, log_info
+from ..utils import scheduler
+
+READ_SIZE = 65536
+DEFAULT_POLL_MS = 1000
+
+_REOPEN_EVENTS = (
+    Gio.FileMonitorEvent.CREATED,
+    Gio.FileMonitorEvent.DELETED,
+    Gio.FileMonitorEvent.MOVED_IN,
+    Gio.FileMonitorEvent.RENAMED,
+)
+
+
+class FileWatch:
+    """
+    Re-reads one file whenever it may have changed, without spawning anything.
+
+    The file is opened once and read with `pread` from offset 0. How changes
+    are noticed depends on where the file lives:
+
+    - procfs files never report changes and are polled every `interval_ms`.
+    - sysfs attributes wake up `poll()` with POLLPRI when the driver calls
+      `sysfs_notify`. Attributes that don't are also polled if an interval
+      is given.
+    - Regular files are watched with a `Gio.FileMonitor` (inotify) and
+      reopened when they are replaced.
+
+    A file that can't be opened is retried on every refresh, and every
+    `DEFAULT_POLL_MS` for sysfs attributes that have no interval.
+
+    `on_data` is only called when the content actually changed.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        on_data: Callable[[str], None],
+        interval_ms: Optional[int] = None,
+        slack_ms: Optional[int] = None,
+        name: Optional[str] = None,
+    ):
+        self.path = path
+        self.on_data = on_data
+        self.interval_ms = interval_ms
+        self.slack_ms = slack_ms
+        self.name = name or path
+        self.fd: Optional[int] = None
+        self.last: Optional[str] = None
+        self._monitor: Optional[Gio.FileMonitor] = None
+        self._watch_id: Optional[int] = None
+        self._cancel_poll: Optional[Callable[[], None]] = None
+        self._sysfs = False
+        self._open_failed = False
+
+    def start(self):
+        real = os.path.realpath(self.path)
+        self._open()
+        if real.startswith("/proc/"):
+            self._poll(self.interval_ms or DEFAULT_POLL_MS)
+            mode = "poll"
+        elif real.startswith("/sys/"):
+            self._sysfs = True
+            self._watch_notify()
+            if self.interval_ms:
+                self._poll(self.interval_ms)
+            elif self.fd is None:
+                self._poll(DEFAULT_POLL_MS)  # until the attribute appears
+            mode = "pollpri"
+        else:
+            self._monitor = Gio.File.new_for_path(self.path).monitor_file(
+                Gio.FileMonitorFlags.WATCH_MOVES, None
+            )
+            self._monitor.connect("changed", self._on_changed)
+            mode = "inotify"
+        log_info(f"Watching {self.path} for {self.name} ({mode})")
+        self.refresh()
+
+    def _open(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        try:
+            self.fd = os.open(self.path, os.O_RDONLY | os.O_CLOEXEC)
+        except OSError as e:
+            if not self._open_failed:
+                log_error(f"{self.name}: cannot open {self.path}: {e}")
+            self._open_failed = True
+            return
+        if self._open_failed:
+            log_info(f"{self.name}: opened {self.path}")
+            self._open_failed = False
+
+    def _watch_notify(self):
+        if self.fd is None or self._watch_id is not None:
+            return
+        self._watch_id = GLib.io_add_watch(
+            self.fd,
+            GLib.PRIORITY_DEFAULT,
+            GLib.IOCondition.PRI | GLib.IOCondition.ERR,
+            self._on_notify,
+        )
+
+    def _retry_open(self):
+        self._open()
+        if self.fd is None or not self._sysfs:
+            return
+        self._watch_notify()
+        if not self.interval_ms and self._cancel_poll is not None:
+            # the retry poll, notifications take over
+            self._cancel_poll()
+            self._cancel_poll = None
+
+    def _read(self) -> Optional[str]:
+        if self.fd is None:
+            return None
+        chunks = []
+        offset = 0
+        while True:
+            chunk = os.pread(self.fd, READ_SIZE, offset)
+            chunks.append(chunk)
+            offset += len(chunk)
+            if len(chunk) < READ_SIZE:
+                break
+        return b"".join(chunks).decode(TEXT_ENCODING, "replace").strip()
+
+    def refresh(self):
+        """Read the file and report it if it changed."""
+        if self.fd is None:
+            self._retry_open()
+        try:
+            data = self._read()
+        except OSError as e:
+            data = f"Error: {e}"
+        if data is None or data == self.last:
+            return
+        self.last = data
+        self.on_data(data)
+
+    def _poll(self, interval_ms: int):
+        self._cancel_poll = scheduler.add(
+            self.refresh, interval_ms, self.slack_ms, name=self.name
+        )
+
+    def _on_notify(self, _fd, _condition):
+        self.refresh()  # reading re-arms the notification
+        return True
+
+    def _on_changed(self, _monitor, _file, _other, event: Gio.FileMonitorEvent):
+        if event in _REOPEN_EVENTS:
+            self._open()
+        elif event != Gio.FileMonitorEvent.CHANGES_DONE_HINT:
+            return
+        self.refresh()
+
+    def stop(self):
+        if self._cancel_poll is not None:
+            self._cancel_poll()
+            self._cancel_poll = None
+        if self._watch_id is not None:
+            GLib.source_remove(self._watch_id)
+            self._watch_id = None
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+__all__ = ["FileWatch"]
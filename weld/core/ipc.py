@@ -0,0 +1,251 @@
+import struct
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..constants import TEXT_ENCODING
+from ..gi_modules import Gio, GLib
+from ..log import log_exception, log_info, log_warning
+from ..type import Framing
+from ..utils import loads
+
+READ_CHUNK_SIZE = 65536
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+RECONNECT_MIN_MS = 250
+RECONNECT_MAX_MS = 30000
+
+_LENGTH = struct.Struct(">I")
+
+# One message, decoded as text whatever the framing
+Frame = str
+
+
+def _cancelled(error: GLib.Error) -> bool:
+    return error.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED)
+
+
+class _Subscriber:
+    __slots__ = ("callback", "route", "latest_only", "batch_ms", "pending")
+
+    def __init__(
+        self,
+        callback: Callable[[List[Frame]], None],
+        route: Optional[str],
+        latest_only: bool,
+        batch_ms: int,
+    ):
+        self.callback = callback
+        self.route = route
+        self.latest_only = latest_only
+        self.batch_ms = batch_ms
+        self.pending: List[Frame] = []
+
+
+class IPCConnection:
+    """
+    One connection to a UNIX socket, shared by every state that reads it.
+
+    Lost or refused connections are retried with exponential backoff, so a
+    restarting daemon is picked up again without restarting the widget.
+    Messages are routed to subscribers by the `route_key` field of their
+    JSON body and handed over in batches. Subscribers that only want the
+    latest value get the newest frame of each batch window and nothing else.
+    """
+
+    def __init__(self, path: str, framing: Framing, route_key: str):
+        self.path = path
+        self.framing = framing
+        self.route_key = route_key
+        self.subscribers: List[_Subscriber] = []
+        self._connection: Optional[Gio.SocketConnection] = None
+        self._cancellable: Optional[Gio.Cancellable] = None
+        self._buffer = b""
+        self._retry_ms = RECONNECT_MIN_MS
+        self._retry_id: Optional[int] = None
+        self._flush_id: Optional[int] = None
+
+    def connect(self):
+        self._cancellable = Gio.Cancellable()
+        Gio.SocketClient().connect_async(
+            Gio.UnixSocketAddress.new(self.path), self._cancellable, self._on_connect
+        )
+
+    def _on_connect(self, client: Gio.SocketClient, result: Gio.AsyncResult):
+        try:
+            self._connection = client.connect_finish(result)
+        except GLib.Error as e:
+            if not _cancelled(e):
+                self._retry(e.message)
+            return
+        log_info(f"IPC connected to {self.path}")
+        self._buffer = b""
+        self._read()
+
+    def _read(self):
+        self._connection.get_input_stream().read_bytes_async(
+            READ_CHUNK_SIZE, GLib.PRIORITY_DEFAULT, self._cancellable, self._on_read
+        )
+
+    def _on_read(self, stream: Gio.InputStream, result: Gio.AsyncResult):
+        try:
+            data = stream.read_bytes_finish(result).get_data()
+        except GLib.Error as e:
+            if not _cancelled(e):
+                self._retry(e.message)
+            return
+        if not data:
+            self._retry("connection closed")
+            return
+        # only a peer that actually talks resets the backoff
+        self._retry_ms = RECONNECT_MIN_MS
+        self._buffer += data
+        try:
+            frames = self._split()
+        except ValueError as e:
+            self._retry(str(e))
+            return
+        for frame in frames:
+            self._route(frame)
+        # read on before delivering, a subscriber may close the connection
+        self._read()
+        self._schedule_flush()
+
+    def _split(self) -> List[Frame]:
+        if self.framing == Framing.LINE:
+            *lines, self._buffer = self._buffer.split(b"\n")
+            if len(self._buffer) > MAX_FRAME_SIZE:
+                raise ValueError("line exceeds the frame size limit")
+            return [line.decode(TEXT_ENCODING, "replace").strip() for line in lines]
+
+        frames: List[Frame] = []
+        offset = 0
+        while len(self._buffer) - offset >= _LENGTH.size:
+            (size,) = _LENGTH.unpack_from(self._buffer, offset)
+            if size > MAX_FRAME_SIZE:
+                raise ValueError(f"frame of {size} bytes exceeds the limit")
+            end = offset + _LENGTH.size + size
+            if len(self._buffer) < end:
+                break
+            payload = self._buffer[offset + _LENGTH.size : end]
+            frames.append(payload.decode(TEXT_ENCODING, "replace"))
+            offset = end
+        self._buffer = self._buffer[offset:]
+        return frames
+
+    def _route_of(self, frame: Frame) -> Optional[str]:
+        try:
+            message = loads(frame)
+        except ValueError:
+            return None
+        if not isinstance(message, dict) or message.get(self.route_key) is None:
+            return None
+        return str(message[self.route_key])
+
+    def _route(self, frame: Frame):
+        route = None
+        if any(subscriber.route is not None for subscriber in self.subscribers):
+            route = self._route_of(frame)
+        for subscriber in self.subscribers:
+            if subscriber.route is not None and subscriber.route != route:
+                continue
+            if subscriber.latest_only:
+                subscriber.pending[:] = [frame]
+            else:
+                subscriber.pending.append(frame)
+
+    def _schedule_flush(self):
+        if self._flush_id is not None or not self.subscribers:
+            return
+        batch_ms = min(subscriber.batch_ms for subscriber in self.subscribers)
+        if batch_ms <= 0:
+            self._flush()
+        else:
+            self._flush_id = GLib.timeout_add(batch_ms, self._flush)
+
+    def _flush(self):
+        self._flush_id = None
+        for subscriber in list(self.subscribers):
+            if subscriber.pending:
+                frames, subscriber.pending = subscriber.pending, []
+                try:
+                    subscriber.callback(frames)
+                except Exception as e:
+                    log_exception(f"IPC {self.path}: subscriber failed: {e}")
+        return False
+
+    def _retry(self, reason: str):
+        self._disconnect()
+        log_warning(f"IPC {self.path}: {reason}, reconnecting in {self._retry_ms} ms.")
+        self._retry_id = GLib.timeout_add(self._retry_ms, self._on_retry)
+        self._retry_ms = min(self._retry_ms * 2, RECONNECT_MAX_MS)
+
+    def _on_retry(self):
+        self._retry_id = None
+        self.connect()
+        return False
+
+    def _disconnect(self):
+        if self._cancellable is not None:
+            self._cancellable.cancel()
+            self._cancellable = None
+        if self._connection is not None and not self._connection.is_closed():
+            self._connection.close(None)
+        self._connection = None
+        self._buffer = b""
+
+    def close(self):
+        self._disconnect()
+        for source_id in (self._retry_id, self._flush_id):
+            if source_id is not None:
+                GLib.source_remove(source_id)
+        self._retry_id = self._flush_id = None
+
+
+class IPCHub:
+    """Opens one `IPCConnection` per socket, framing and route key."""
+
+    def __init__(self):
+        self._connections: Dict[Tuple[str, Framing, str], IPCConnection] = {}
+
+    def subscribe(
+        self,
+        path: str,
+        callback: Callable[[List[Frame]], None],
+        framing: Framing = Framing.LINE,
+        route_key: str = "event",
+        route: Optional[str] = None,
+        latest_only: bool = False,
+        batch_ms: int = 0,
+    ) -> Callable[[], None]:
+        """Receive batches of the messages read from the socket at `path`.
+
+        Args:
+            path: Socket to connect to.
+            callback: Called with the frames received since the last call.
+            framing: Newline delimited text or length-prefixed payloads.
+            route_key: JSON field that routes messages to subscribers.
+            route: Only receive messages whose `route_key` equals this.
+            latest_only: Only receive the newest frame of each batch.
+            batch_ms: Window in which frames are gathered.
+        Returns:
+            A function to unsubscribe. The last one closes the connection.
+        """
+        key = (path, framing, route_key)
+        connection = self._connections.get(key)
+        if connection is None:
+            connection = IPCConnection(path, framing, route_key)
+            self._connections[key] = connection
+            connection.connect()
+        subscriber = _Subscriber(callback, route, latest_only, batch_ms)
+        connection.subscribers.append(subscriber)
+
+        def unsubscribe():
+            if subscriber not in connection.subscribers:
+                return
+            connection.subscribers.remove(subscriber)
+            if not connection.subscribers:
+                connection.close()
+                del self._connections[key]
+
+        return unsubscribe
+
+
+__all__ = ["IPCConnection", "IPCHub"]
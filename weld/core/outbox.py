@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import json
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from ..gi_modules import GLib
+from ..log import log_error
+from ..profiler import profiler
+from ..utils import diff, dumps, loads
+
+if TYPE_CHECKING:
+    from .widget import WidgetWindow
+
+
+class StateOutbox:
+    """
+    Per-widget queue of pending setState updates.
+
+    Updates are collected from any thread and flushed once per frame (on the
+    WebView's frame clock) as a single script, instead of one
+    `evaluate_javascript` per update.
+
+    The last payload of every event is kept so that only a structural diff
+    is sent to the page, where `window.weldState` (web/state.js) applies it
+    and dispatches the merged value as `weld:<event>`. Identical payloads are
+    dropped. A decoded copy of every payload is kept, so handlers may mutate
+    and resend the same object.
+    """
+
+    widget: WidgetWindow
+    last: Dict[str, Any]
+
+    def __init__(self, widget: WidgetWindow, last: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            widget (WidgetWindow): The widget whose page receives the updates.
+            last (dict): Last payload of every event. Passing the cache of a
+                         previous instance replays it on the first load.
+        """
+        self.widget = widget
+        self.last = last if last is not None else {}
+        # (method, event, encoded argument) for window.weldState.<method>
+        self._pending: List[Tuple[str, str, str]] = []
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self._ready = False
+        self._tick_id: Optional[int] = None
+        self._closed = False
+
+    def push(self, event: str, data: Any, delta: bool = True):
+        """
+        Queue an update of `weld:<event>`. Safe to call from any thread.
+        Args:
+            event (str): The event name, without the `weld:` prefix.
+            data (Any): JSON serializable payload.
+            delta (bool): Send a patch against the previous payload and skip
+                          identical ones. Stream-like events that must see
+                          every message should pass False.
+        """
+        try:
+            encoded = dumps(data)
+        except (TypeError, ValueError) as e:
+            log_error(f"Error: payload of {event} is not JSON serializable: {e}")
+            return
+        # the caller may mutate `data` in place and send it again
+        snapshot = loads(encoded)
+        with self._lock:
+            if self._closed:
+                return
+            if not self._ready:
+                # the page receives the latest value on resync()
+                self.last[event] = snapshot
+                return
+            if delta and event in self.last:
+                ops = diff(self.last[event], snapshot)
+                if not ops:
+                    return
+                self._pending.append(("patch", event, dumps(ops)))
+            else:
+                self._pending.append(("set", event, encoded))
+            self.last[event] = snapshot
+            if self._scheduled:
+                return
+            self._scheduled = True
+        GLib.idle_add(self._arm)
+
+    def hold(self):
+        """Stop flushing, the page is being (re)loaded."""
+        with self._lock:
+            self._ready = False
+
+    def resync(self):
+        """
+        Send the full last value of every event to a freshly loaded page.
+        Anything still queued is superseded by those values.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._pending = [
+                ("set", event, dumps(data)) for event, data in self.last.items()
+            ]
+            self._ready = True
+        self.flush()
+
+    def _arm(self):
+        """Wait for the next frame, or flush right away if nothing is drawn."""
+        if self._closed:
+            return False
+        view = self.widget.view
+        if view.get_mapped():
+            # Unmapped widgets have no running frame clock.
+            self._tick_id = view.add_tick_callback(self._on_tick)
+        else:
+            self.flush()
+        return False
+
+    def _on_tick(self, widget, frame_clock):
+        self._tick_id = None
+        self.flush()
+        return GLib.SOURCE_REMOVE
+
+    def flush(self):
+        """Send every queued update in a single script."""
+        with self._lock:
+            self._scheduled = False
+            if not self._ready:
+                return
+            pending, self._pending = self._pending, []
+        if not pending or self._closed:
+            return
+        script = "".join(
+            f"window.weldState.{method}({json.dumps(event)},{payload});"
+            for method, event, payload in pending
+        )
+        self.widget.execute_script(script)
+        profiler.mark("first state delivered", self.widget.name)
+
+    def close(self):
+        """Drop pending updates and stop flushing."""
+        with self._lock:
+            self._closed = True
+            self._pending.clear()
+        if self._tick_id is not None:
+            try:
+                self.widget.view.remove_tick_callback(self._tick_id)
+            except Exception:
+                pass
+            self._tick_id = None
+
+
+__all__ = ["StateOutbox"]
@@ -0,0 +1,92 @@
+from typing import List, Tuple
+
+from ..gi_modules import GLib, WebKit2
+from ..log import log_debug
+
+# Pre-created WebViews kept by BaseWebView, see WebViewPool
+WEBVIEW_POOL_SIZE = 2
+
+_BLANK = "about:blank"
+
+
+class WebViewPool:
+    """
+    WebViews created ahead of time, so `weldctl add` doesn't wait for one.
+
+    Every pooled view is related to the base view (same web process) and
+    has already loaded about:blank, so its page exists on the web process
+    side and only the widget's own document is left to load. Views are
+    created one per idle callback, at low priority, and the pool is
+    refilled the same way after a view has been taken.
+    """
+
+    def __init__(self, related_view: WebKit2.WebView, size: int = WEBVIEW_POOL_SIZE):
+        self.related_view = related_view
+        self.size = size
+        # (view, load-changed handler id) in creation order
+        self._warming: List[Tuple[WebKit2.WebView, int]] = []
+        self._ready: List[WebKit2.WebView] = []
+        self._fill_id = None
+        self._hits = 0
+        self._misses = 0
+        self._schedule_fill()
+
+    def take(self) -> WebKit2.WebView:
+        """Return a warm WebView, or a new one if none has finished warming."""
+        if self._ready:
+            view = self._ready.pop(0)
+            self._hits += 1
+        else:
+            view = WebKit2.WebView.new_with_related_view(self.related_view)
+            self._misses += 1
+        self._schedule_fill()
+        return view
+
+    def _schedule_fill(self):
+        if self._fill_id is None and self.size > 0:
+            self._fill_id = GLib.idle_add(self._fill, priority=GLib.PRIORITY_LOW)
+
+    def _fill(self):
+        if len(self._ready) + len(self._warming) >= self.size:
+            self._fill_id = None
+            return GLib.SOURCE_REMOVE
+        view = WebKit2.WebView.new_with_related_view(self.related_view)
+        handler_id = view.connect("load-changed", self._on_load_changed)
+        self._warming.append((view, handler_id))
+        view.load_uri(_BLANK)
+        return GLib.SOURCE_CONTINUE
+
+    def _on_load_changed(self, view: WebKit2.WebView, load_event: WebKit2.LoadEvent):
+        if load_event != WebKit2.LoadEvent.FINISHED:
+            return
+        for i, (warming, handler_id) in enumerate(self._warming):
+            if warming is view:
+                view.disconnect(handler_id)
+                del self._warming[i]
+                self._ready.append(view)
+                log_debug(f"WebView pool: {len(self._ready)}/{self.size} ready")
+                break
+
+    def stats(self) -> dict:
+        return {
+            "ready": len(self._ready),
+            "size": self.size,
+            "hits": self._hits,
+            "misses": self._misses,
+        }
+
+    def close(self):
+        """Stop refilling and drop the pooled views."""
+        if self._fill_id is not None:
+            GLib.source_remove(self._fill_id)
+            self._fill_id = None
+        for view, handler_id in self._warming:
+            view.disconnect(handler_id)
+            view.destroy()
+        for view in self._ready:
+            view.destroy()
+        self._warming.clear()
+        self._ready.clear()
+
+
+__all__ = ["WebViewPool", "WEBVIEW_POOL_SIZE"]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import TYPE_CHECKING, Dict, Optional, Set
+
+from .. import constants
+from ..constants import CONFIG_FILE
+from ..gi_modules import Gio, GLib
+from ..log import log_info
+
+if TYPE_CHECKING:
+    from .widget import WidgetWindow
+
+# Editors save in several steps, wait for them to settle
+DEBOUNCE_MS = 150
+
+_IGNORED_DIRS = {"node_modules", "__pycache__"}
+
+_RELEVANT_EVENTS = (
+    Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+    Gio.FileMonitorEvent.CREATED,
+    Gio.FileMonitorEvent.DELETED,
+    Gio.FileMonitorEvent.MOVED_IN,
+    Gio.FileMonitorEvent.MOVED_OUT,
+    Gio.FileMonitorEvent.RENAMED,
+)
+
+
+def _ignored(name: str) -> bool:
+    # hidden files and the temporary files of vim, emacs and friends
+    return name.startswith((".", "#")) or name.endswith(("~", ".swp", ".swx"))
+
+
+class WidgetReloader:
+    """
+    Applies edits of a widget directory to the running widget.
+
+    - Stylesheets are swapped in place, the page keeps its state.
+    - config.py is re-read and only the states and window settings that
+      changed are restarted, see `WidgetWindow.reload_config`.
+    - Any other file reloads the page.
+    """
+
+    def __init__(self, widget: WidgetWindow):
+        self.widget = widget
+        self._monitors: Dict[str, Gio.FileMonitor] = {}
+        self._changed: Set[str] = set()
+        self._timeout_id: Optional[int] = None
+
+    def start(self):
+        for directory, subdirs, _ in os.walk(self.widget.path):
+            subdirs[:] = [d for d in subdirs if not _ignored(d)]
+            subdirs[:] = [d for d in subdirs if d not in _IGNORED_DIRS]
+            self._watch(directory)
+        log_info(f"Watching {self.widget.path} for changes")
+
+    def _watch(self, directory: str):
+        if directory in self._monitors:
+            return
+        monitor = Gio.File.new_for_path(directory).monitor_directory(
+            Gio.FileMonitorFlags.WATCH_MOVES, None
+        )
+        monitor.connect("changed", self._on_changed)
+        self._monitors[directory] = monitor
+
+    def _on_changed(self, _monitor, file: Gio.File, other: Optional[Gio.File], event):
+        if event not in _RELEVANT_EVENTS:
+            return
+        # a rename (e.g. an atomic save) is a change of the new name
+        path = other.get_path() if other is not None else file.get_path()
+        if _ignored(os.path.basename(path)):
+            return
+        if os.path.isdir(path):
+            if event != Gio.FileMonitorEvent.DELETED:
+                self._watch(path)
+            return
+        self._changed.add(os.path.relpath(path, self.widget.path))
+        if self._timeout_id is not None:
+            GLib.source_remove(self._timeout_id)
+        self._timeout_id = GLib.timeout_add(DEBOUNCE_MS, self._apply)
+
+    def _apply(self):
+        self._timeout_id = None
+        changed, self._changed = self._changed, set()
+        if CONFIG_FILE in changed:
+            log_info(f"{self.widget.name}: {CONFIG_FILE} changed, applying")
+            if self.widget.reload_config():
+                return False  # the page has been reloaded if it had to
+            changed.discard(CONFIG_FILE)
+        if not changed:
+            return False
+        if all(path.endswith(".css") for path in changed):
+            log_info(f"{self.widget.name}: swapping {', '.join(sorted(changed))}")
+            paths = [os.path.join(self.widget.path, path) for path in changed]
+            self.widget.execute_script(
+                f"({constants.RELOAD_CSS_JS})({json.dumps(paths)});"
+            )
+        else:
+            log_info(f"{self.widget.name}: {', '.join(sorted(changed))} changed")
+            self.widget.view.reload()
+        return False
+
+    def stop(self):
+        if self._timeout_id is not None:
+            GLib.source_remove(self._timeout_id)
+            self._timeout_id = None
+        for monitor in self._monitors.values():
+            monitor.cancel()
+        self._monitors.clear()
+
+
+__all__ = ["WidgetReloader"]
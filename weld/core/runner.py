@@ -0,0 +1,116 @@
+import shlex
+import subprocess
+from typing import Any, Callable, Dict, Optional
+
+from ..constants import COMMAND_TIMEOUT_MS
+from ..log import log_error, log_exception, log_warning
+from ..type import State
+from ..utils import Command, CommandTemplate, Coprocess, executor, run_cmd
+
+
+class ScriptRunner:
+    """
+    Runs the script of one state on the shared worker pool.
+
+    Scheduled runs are skipped while the previous one is still going, and a
+    run that exceeds `State.timeoutMs` (COMMAND_TIMEOUT_MS if unset) has its
+    whole process group killed, so hung scripts can't hold the workers.
+    Both are counted for `weldctl stats`.
+
+    The script is a shell string or an argv list that is executed without a
+    shell. With `State.coprocess` set, runs are sent to one long-lived
+    interpreter instead of forking a new process each time.
+    """
+
+    widget: str
+    state: State
+
+    def __init__(self, widget: str, state: State, set_state: Callable[[Any], None]):
+        self.widget = widget
+        self.state = state
+        self.set_state = set_state
+        self.in_flight = False
+        self.runs = 0
+        self.skipped = 0
+        self.timeouts = 0
+        self.template = CommandTemplate(state.script) if state.script else None
+        self.coprocess = Coprocess(state.coprocess) if state.coprocess else None
+
+    @property
+    def timeout_ms(self) -> int:
+        return self.state.timeoutMs or COMMAND_TIMEOUT_MS
+
+    @property
+    def name(self) -> str:
+        return f"{self.widget}:{self.state.event}"
+
+    def run(self, args: Optional[Dict[str, str]] = None, skip_if_running=True):
+        """
+        Run the script and hand its output to the state handler.
+        Args:
+            args (dict): Values for `{key}` placeholders in the script.
+            skip_if_running (bool): Do nothing if a run is still in flight.
+                                    Manual triggers pass False.
+        """
+        if self.template is None:
+            log_error(f"{self.name}: state.script is None, cannot run command.")
+            return
+        if skip_if_running and self.in_flight:
+            self.skipped += 1
+            if self.skipped == 1 or self.skipped % 100 == 0:
+                log_warning(
+                    f"{self.name}: previous run still going, "
+                    f"skipped {self.skipped} run(s) so far."
+                )
+            return
+        cmd = self.template.render(args)
+
+        self.in_flight = True
+        self.runs += 1
+        timeout = self.timeout_ms / 1000
+        executor.submit(
+            lambda: self._execute(cmd, timeout),
+            self._done,
+            self.widget,
+            on_error=lambda e: self._done(f"Error: {e}"),
+        )
+
+    def _execute(self, cmd: Command, timeout: Optional[float]) -> Optional[str]:
+        try:
+            if self.coprocess is not None:
+                if not isinstance(cmd, str):
+                    cmd = shlex.join(cmd)
+                return self.coprocess.request(cmd, timeout)
+            return run_cmd(cmd, timeout)
+        except subprocess.TimeoutExpired:
+            return None
+        except Exception as e:
+            log_exception(f"{self.name}: run failed: {e}")
+            return f"Error: {e}"
+
+    def _done(self, output: Optional[str]):
+        self.in_flight = False
+        if output is None:
+            self.timeouts += 1
+            log_warning(
+                f"{self.name}: killed after {self.timeout_ms} ms "
+                f"({self.timeouts} timeout(s) so far)."
+            )
+            output = f"Error: timed out after {self.timeout_ms} ms"
+        self.state.handler(output, self.set_state)
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "timeouts": self.timeouts,
+            "running": self.in_flight,
+        }
+
+    def close(self):
+        if self.coprocess is not None:
+            self.coprocess.close()
+
+
+__all__ = ["ScriptRunner"]
@@ -0,0 +1,151 @@
+import json
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from ..log import log_info
+from ..utils import loads
+
+_UNSET = object()
+
+Handlers = Dict[str, Callable]
+
+
+class _StreamFanOut:
+    """Stream channel look-alike writing to the channel of every subscriber."""
+
+    def __init__(self, service: "_SharedService"):
+        self._service = service
+
+    def write(self, frame: Union[bytes, str]):
+        for set_state in self._service.snapshot():
+            set_state.open_stream().write(frame)
+
+    def send(self, data: Any):
+        for set_state in self._service.snapshot():
+            set_state.open_stream().send(data)
+
+
+class _SharedService:
+    """One running service instance and the widgets subscribed to it."""
+
+    def __init__(self, key: Tuple[Callable, str]):
+        self.key = key
+        self.subscribers: List[Callable[[Any], None]] = []
+        self.last: Any = _UNSET
+        self.stop: Callable[[], None] = lambda: None
+        self.handlers: Handlers = {}
+        self._lock = threading.Lock()
+        self._stream = _StreamFanOut(self)
+
+    def snapshot(self) -> List[Callable[[Any], None]]:
+        with self._lock:
+            return list(self.subscribers)
+
+    def set_state(self, data: Any):
+        """setState given to the instance, fans out to every subscriber."""
+        if isinstance(data, (str, bytes)):
+            # decode legacy JSON strings once instead of once per widget
+            try:
+                data = loads(data)
+            except ValueError:
+                pass
+        with self._lock:
+            self.last = data
+            subscribers = list(self.subscribers)
+        for set_state in subscribers:
+            set_state(data)
+
+    def subscribe(self, set_state: Callable[[Any], None]):
+        with self._lock:
+            self.subscribers.append(set_state)
+            last = self.last
+        if last is not _UNSET:
+            # late subscribers get the current state right away
+            set_state(last)
+
+    def unsubscribe(self, set_state: Callable[[Any], None]) -> int:
+        with self._lock:
+            if set_state in self.subscribers:
+                self.subscribers.remove(set_state)
+            return len(self.subscribers)
+
+
+class ServiceHub:
+    """
+    Deduplicates SERVICE states across widgets.
+
+    States with the same `service_factory` and `service_arguments` share one
+    reference-counted instance whose output is fanned out to the setState of
+    every subscribed widget. The instance is stopped when the last widget
+    releases it. Services opt in with `shared = True` on the class.
+    """
+
+    services: Dict[Tuple[Callable, str], _SharedService]
+
+    def __init__(self):
+        self.services = {}
+
+    def acquire(
+        self,
+        factory: Callable,
+        arguments: Optional[dict],
+        set_state: Callable[[Any], None],
+    ) -> Tuple[Callable[[], None], Handlers]:
+        """
+        Subscribe `set_state` to a service, starting it if needed.
+        Returns:
+            tuple: (release, handlers). `release` unsubscribes the widget.
+        """
+        key = self._key(factory, arguments)
+        if key is None:
+            instance = factory(set_state, arguments)
+            stop, handlers = instance.start()
+            return (stop or (lambda: None), handlers or {})
+
+        service = self.services.get(key)
+        if service is None:
+            service = _SharedService(key)
+            instance = factory(self._updater(service), arguments)
+            stop, handlers = instance.start()
+            service.stop = stop or (lambda: None)
+            service.handlers = handlers or {}
+            self.services[key] = service
+            log_info(f"Started shared service {getattr(factory, '__name__', factory)}")
+        service.subscribe(set_state)
+
+        released = False
+
+        def release():
+            nonlocal released
+            if released:
+                return
+            released = True
+            if service.unsubscribe(set_state) == 0:
+                self.services.pop(key, None)
+                log_info(
+                    f"Stopping shared service {getattr(factory, '__name__', factory)}"
+                )
+                service.stop()
+
+        return (release, service.handlers)
+
+    @staticmethod
+    def _updater(service: _SharedService) -> Callable[[Any], None]:
+        def set_state(data: Any):
+            service.set_state(data)
+
+        set_state.open_stream = lambda: service._stream
+        return set_state
+
+    @staticmethod
+    def _key(factory: Callable, arguments: Optional[dict]):
+        if not getattr(factory, "shared", False):
+            return None
+        try:
+            return (factory, json.dumps(arguments, sort_keys=True))
+        except (TypeError, ValueError):
+            # arguments that can't be compared reliably are never shared
+            return None
+
+
+__all__ = ["ServiceHub"]
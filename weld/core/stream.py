@@ -0,0 +1,204 @@
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from ..constants import STREAM_SCHEME, TEXT_ENCODING
+from ..gi_modules import Gio, GLib, Soup, WebKit2
+from ..log import log_debug, log_error, log_info
+from ..utils import dumps
+
+
+class _Consumer:
+    """Write end of the pipe backing one `fetch()` of a stream."""
+
+    def __init__(self, fd: int):
+        self.fd = fd
+        self.pending = b""
+        self.watch_id: Optional[int] = None
+        self.closed = False
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.watch_id is not None:
+            GLib.source_remove(self.watch_id)
+            self.watch_id = None
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class StreamChannel:
+    """
+    Frames for one `weld-stream://<widget>/<event>` URI.
+
+    Every request to the URI gets its own pipe, so any number of pages can
+    read the channel at once. Writes never block: a reader that has not
+    drained the previous frame misses the new one instead of stalling the
+    writer.
+    """
+
+    widget: str
+    event: str
+
+    def __init__(self, widget: str, event: str):
+        self.widget = widget
+        self.event = event
+        self._consumers: List[_Consumer] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def uri(self) -> str:
+        return f"{STREAM_SCHEME}://{self.widget}/{self.event}"
+
+    def has_consumers(self) -> bool:
+        return bool(self._consumers)
+
+    def write(self, frame: Union[bytes, str]):
+        """Write a raw frame to every reader. Safe to call from any thread."""
+        if isinstance(frame, str):
+            frame = frame.encode(TEXT_ENCODING)
+        with self._lock:
+            for consumer in list(self._consumers):
+                if consumer.pending:
+                    continue
+                self._write_to(consumer, frame)
+
+    def send(self, data: Any):
+        """Write `data` as one line of newline delimited JSON."""
+        self.write(dumps(data) + "\n")
+
+    def _write_to(self, consumer: _Consumer, frame: bytes):
+        try:
+            written = os.write(consumer.fd, frame)
+        except BlockingIOError:
+            return
+        except OSError:
+            # BrokenPipe: the page stopped reading
+            self._drop(consumer)
+            return
+        if written < len(frame):
+            # Finish this frame before accepting new ones so framing holds.
+            consumer.pending = frame[written:]
+            consumer.watch_id = GLib.io_add_watch(
+                consumer.fd,
+                GLib.PRIORITY_DEFAULT,
+                GLib.IO_OUT | GLib.IO_ERR | GLib.IO_HUP,
+                self._on_writable,
+                consumer,
+            )
+
+    def _on_writable(self, fd, condition, consumer: _Consumer):
+        with self._lock:
+            if consumer.closed:
+                return False
+            if condition & (GLib.IO_ERR | GLib.IO_HUP):
+                consumer.watch_id = None
+                self._drop(consumer)
+                return False
+            try:
+                written = os.write(consumer.fd, consumer.pending)
+            except BlockingIOError:
+                return True
+            except OSError:
+                consumer.watch_id = None
+                self._drop(consumer)
+                return False
+            consumer.pending = consumer.pending[written:]
+            if consumer.pending:
+                return True
+            consumer.watch_id = None
+            return False
+
+    def _drop(self, consumer: _Consumer):
+        consumer.close()
+        if consumer in self._consumers:
+            self._consumers.remove(consumer)
+        log_debug(f"Reader of {self.uri} went away.")
+
+    def attach(self, request: WebKit2.URISchemeRequest):
+        """Answer a scheme request with a new pipe fed by this channel."""
+        if self._closed:
+            request.finish_error(
+                GLib.Error.new_literal(
+                    Gio.io_error_quark(), "Stream closed", Gio.IOErrorEnum.CLOSED
+                )
+            )
+            return
+        read_fd, write_fd = os.pipe()
+        os.set_blocking(write_fd, False)
+
+        response = WebKit2.URISchemeResponse.new(
+            Gio.UnixInputStream.new(read_fd, True), -1
+        )
+        response.set_status(200, "OK")
+        response.set_content_type("text/plain")
+        headers = Soup.MessageHeaders.new(Soup.MessageHeadersType.RESPONSE)
+        headers.append("Access-Control-Allow-Origin", "*")
+        headers.append("Cache-Control", "no-store")
+        response.set_http_headers(headers)
+
+        with self._lock:
+            self._consumers.append(_Consumer(write_fd))
+        request.finish_with_response(response)
+        log_info(f"New reader for {self.uri} ({len(self._consumers)} total).")
+
+    def close(self):
+        """End the stream for every reader."""
+        with self._lock:
+            self._closed = True
+            for consumer in self._consumers:
+                consumer.close()
+            self._consumers.clear()
+
+
+class StreamHub:
+    """Registry of every stream channel, keyed by widget and event."""
+
+    channels: Dict[Tuple[str, str], StreamChannel]
+
+    def __init__(self):
+        self.channels = {}
+        self._lock = threading.Lock()
+
+    def channel(self, widget: str, event: str) -> StreamChannel:
+        """Get the channel for `weld-stream://<widget>/<event>`, creating it."""
+        with self._lock:
+            key = (widget, event)
+            if key not in self.channels:
+                self.channels[key] = StreamChannel(widget, event)
+            return self.channels[key]
+
+    def handle_request(self, request: WebKit2.URISchemeRequest, widget: str):
+        """
+        Route a scheme request made by `widget`.
+        Widgets can only read their own streams.
+        """
+        path = request.get_uri()[len(STREAM_SCHEME) + 3 :]
+        target, _, event = path.partition("/")
+        event = event.split("?", 1)[0]
+        if target != widget or not event:
+            log_error(f"Stream '{path}' denied for widget: {widget}")
+            request.finish_error(
+                GLib.Error.new_literal(
+                    Gio.io_error_quark(),
+                    "Stream not found",
+                    Gio.IOErrorEnum.NOT_FOUND,
+                )
+            )
+            return
+        self.channel(widget, event).attach(request)
+
+    def close_widget(self, widget: str):
+        """Close every channel of a widget."""
+        with self._lock:
+            keys = [key for key in self.channels if key[0] == widget]
+            channels = [self.channels.pop(key) for key in keys]
+        for channel in channels:
+            channel.close()
+
+
+__all__ = ["StreamChannel", "StreamHub"]
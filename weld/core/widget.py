@@ -1,28 +1,34 @@
 from __future__ import annotations
 
 import importlib.resources
+import dis
 import json
 import os
 import socket
-from typing import Callable, List, Optional, Union
+import sys
+from types import CodeType, ModuleType
+from typing import Any, Callable, List, Optional, Union
 
 from pydantic import ValidationError, parse_obj_as
 
+from .. import constants
 from ..constants import (
-    CONFIG_FILE,
-    INPUT_MASK_JS,
     PATH_TO_INTERPETER,
+    PRELOAD_FILE,
     SCRIPT_MESSAGE_HANDLER,
     SCRIPT_MESSAGE_RECEIVED_SIGNAL,
     SOCKET_PATH,
     SOURCE_HTML,
-    SYNC_DIMENSIONS_JS,
+    STREAM_BATCH_MS,
+    STREAM_SCHEME,
     TEXT_ENCODING,
     WELD_BIND,
     WIDGET_DIR,
 )
 from ..gi_modules import Gdk, Gio, GLib, Gtk, GtkLayerShell, WebKit2
 from ..log import log_debug, log_error, log_exception, log_info, log_warning
+from ..profiler import profiler
+from ..services import get_service
 from ..type import (
     AnchorType,
     CliOptions,
@@ -36,12 +42,144 @@ from ..type import (
     UpdateStrategy,
 )
 from ..utils import (
-    run_cmd_non_block,
+    executor,
+    loads,
     run_continuous_cmd,
     run_detached_cmd,
-    run_unix_socket_threaded,
-    set_interval,
+    scheduler,
+    throttle,
 )
+from .config_cache import config_cache
+from .dbus import DBusWatch
+from .file_watch import FileWatch
+from .ipc import IPCHub
+from .outbox import StateOutbox
+from .pool import WEBVIEW_POOL_SIZE, WebViewPool
+from .reload import WidgetReloader
+from .runner import ScriptRunner
+from .service_hub import ServiceHub
+from .stream import StreamHub
+
+# What a keybind can do with its widget, see BaseWebView.refresh_binds
+BIND_ACTIONS = (CliOptions.SEND, CliOptions.SHOW, CliOptions.HIDE, CliOptions.TOGGLE)
+
+# Config fields applied by configure_GTKLayerShell
+LAYER_SHELL_FIELDS = {
+    "layer",
+    "anchors",
+    "top",
+    "bottom",
+    "left",
+    "right",
+    "reserved_space",
+}
+
+
+_EMPTY_CELL = object()
+# Attributes of a class that are not part of its definition
+_CLASS_INTERNALS = {"__dict__", "__weakref__", "__module__", "__qualname__"}
+
+
+def _global_names(code: CodeType) -> List[str]:
+    """Names `code` and the code nested in it read as globals."""
+    names = {
+        instruction.argval
+        for instruction in dis.get_instructions(code)
+        if instruction.opname in ("LOAD_GLOBAL", "LOAD_NAME")
+    }
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            names.update(_global_names(const))
+    return sorted(names)
+
+
+def _importable(cls: type) -> bool:
+    """Whether `cls` is the same object every time config.py is exec'd."""
+    module = sys.modules.get(cls.__module__)
+    return getattr(module, cls.__qualname__, None) is cls
+
+
+def _fingerprint(value: Any, seen: Optional[set] = None) -> Any:
+    """
+    What a value defined in config.py is, comparable across execs of it.
+
+    - Functions: their code, defaults, closure values and the globals they
+      read, recursively.
+    - Classes: their name, bases and attributes, recursively.
+    - Objects compared by identity: their class and attributes, or their
+      repr when they have no `__dict__`. An object without either, or
+      whose repr is the default one, is only compared by class.
+    - Lists, tuples and dicts: their items, recursively.
+
+    Modules, classes imported from a module and anything else are compared
+    as is.
+    """
+    seen = set() if seen is None else seen
+    if isinstance(value, (list, tuple)):
+        return tuple(_fingerprint(item, seen) for item in value)
+    if isinstance(value, dict):
+        return tuple((key, _fingerprint(item, seen)) for key, item in value.items())
+    if isinstance(value, ModuleType):
+        return value
+    code = getattr(value, "__code__", None)
+    is_class = isinstance(value, type)
+    compared_by_identity = type(value).__eq__ is object.__eq__
+    if code is None and not is_class and not compared_by_identity:
+        return value
+    if is_class and _importable(value):
+        return value
+    if id(value) in seen:  # recursion
+        return getattr(value, "__qualname__", type(value).__qualname__)
+    seen.add(id(value))
+
+    if is_class:
+        return (
+            value.__module__,
+            value.__qualname__,
+            tuple(_fingerprint(base, seen) for base in value.__bases__),
+            tuple(
+                (name, _fingerprint(attribute, seen))
+                for name, attribute in value.__dict__.items()
+                if name not in _CLASS_INTERNALS
+            ),
+        )
+    if code is None:
+        kind = _fingerprint(type(value), seen)
+        if hasattr(value, "__dict__"):
+            return (kind, _fingerprint(vars(value), seen))
+        if type(value).__repr__ is not object.__repr__:
+            return (kind, repr(value))
+        return kind
+
+    cells = []
+    for cell in value.__closure__ or ():
+        try:
+            cells.append(_fingerprint(cell.cell_contents, seen))
+        except ValueError:
+            cells.append(_EMPTY_CELL)
+    namespace = value.__globals__
+    referenced = tuple(
+        (name, _fingerprint(namespace[name], seen))
+        for name in _global_names(code)
+        if name in namespace
+    )
+    return (
+        value.__module__,
+        value.__qualname__,
+        code,
+        value.__defaults__,
+        value.__kwdefaults__,
+        tuple(cells),
+        referenced,
+    )
+
+
+def _comparable(state: State) -> dict:
+    """
+    The definition of a state, with functions compared by what they do.
+    Exec'ing config.py again creates new function objects every time.
+    """
+    return {field: _fingerprint(value) for field, value in state}
 
 
 class WidgetWindow(Gtk.Window):
@@ -52,28 +190,45 @@ class WidgetWindow(Gtk.Window):
     name: str
     view: WebKit2.WebView
     states: List[State]
-    interval_runners: List[Callable[[], None]]
-    processes: List[Callable[[], None]]
+    state_stops: dict[str, List[Callable[[], None]]]
+    once_runners: List[Callable[[], None]]
+    script_runners: List[ScriptRunner]
     manual_states: dict[str, Callable[[Optional[dict[str, str]]], None]]
     masks: list[tuple[int, int, int, int]]
     base_webview: BaseWebView
     bindings: list[str]
+    outbox: StateOutbox
+    reloader: Optional[WidgetReloader]
 
-    def __init__(self, name: str, base_webview: BaseWebView):
+    def __init__(self, name: str, base_webview: BaseWebView, visible: bool = True):
         super().__init__()
         self.base_webview = base_webview
         self.name = name
         self.path = os.path.join(WIDGET_DIR, name)
 
         self.manual_states = {}
-        self.interval_runners = []
-        self.processes = []
+        self.state_stops = {}
+        self.once_runners = []
+        self.script_runners = []
         self.states = []
         self.bindings = []
         self.allowedRoutes = []
+        self._states_started = False
+        # events dispatched while the page loads, sent when it has finished
+        self._page_loaded = False
+        self._queued_events: List[str] = []
+        self.reloader = None
+        # Last payload of every event, kept by the base view across restarts.
+        self.outbox = StateOutbox(self, base_webview.state_cache.setdefault(name, {}))
 
         if not self._load_config_file():
+            if not self.outbox.last:
+                del base_webview.state_cache[name]
             return
+        # states removed from config.py while the widget was closed
+        events = {state.event for state in self.states}
+        for event in [event for event in self.outbox.last if event not in events]:
+            del self.outbox.last[event]
 
         self._setup_webview()
 
@@ -81,56 +236,132 @@ class WidgetWindow(Gtk.Window):
 
         self.add(self.view)
         self.base_webview.widgets[name] = self
-        self.show_all()
+        if visible:
+            self.show_all()
+        else:
+            # the page loads and the states run, the window is mapped by show()
+            self.view.show_all()
+
+        if self.base_webview.watch or self.config.hotReload:
+            self.reloader = WidgetReloader(self)
+            self.reloader.start()
 
     def _load_config_file(self) -> bool:
         """Loads config.py, states, and binds. Returns False on failure."""
-        try:
-            with open(os.path.join(self.path, CONFIG_FILE), "r") as f:
-                var = {}
-                exec(f.read(), var)
-                if "config" not in var:
-                    log_error(f"Config not found for {self.name}.")
-                    return False
-                try:
-                    self.config = Config(**var["config"])
-                    if "states" in var:
-                        self.states = [State(**state) for state in var["states"]]
-                    if "binds" in var:
-                        self._load_binds(var["binds"])
-                except ValidationError as e:
-                    log_error(f"Validation error loading config for {self.name}: {e}")
-                    return False
-        except FileNotFoundError:
-            log_error(f"Config file not found for {self.name}.")
+        loaded = self._read_config_file()
+        if loaded is None:
             return False
-
+        self.config, self.states, binds = loaded
+        if binds:
+            self._load_binds(binds)
         super().set_title(self.config.title)
-        self.config.allowedRoutes.append(self.path)
-        for i in range(len(self.config.allowedRoutes)):
-            route = self.config.allowedRoutes[i]
-            if isinstance(route, str):
-                normalized_route = os.path.normpath(route)
-                absolute_route = os.path.abspath(normalized_route)
-                self.config.allowedRoutes[i] = absolute_route
-
         return True
 
+    def _read_config_file(self) -> Optional[tuple[Config, List[State], list]]:
+        """Execute and validate config.py, cached. Returns None on failure."""
+        return config_cache.load(self.path, self.name)
+
+    def reload_config(self) -> bool:
+        """
+        Re-read config.py and apply what changed, for hot reload.
+
+        Only the states whose definition changed are stopped and started
+        again, and only the window settings that changed are re-applied.
+        Turning transparency off restarts the whole widget.
+        Returns:
+            bool: True if the page had to be reloaded.
+        """
+        loaded = self._read_config_file()
+        if loaded is None:
+            return False
+        config, states, binds = loaded
+        if self.config.transparency and not config.transparency:
+            # an app-paintable window can't be made opaque again
+            log_info(f"{self.name}: transparency turned off, restarting")
+            GLib.idle_add(self.base_webview.restart_widget, self.name)
+            return True
+        old_config, self.config = self.config, config
+
+        old_states = {state.event: _comparable(state) for state in self.states}
+        new_states = {state.event: _comparable(state) for state in states}
+        for event, old in old_states.items():
+            if new_states.get(event) != old:
+                self._stop_state(event)
+                if event not in new_states:
+                    self.outbox.last.pop(event, None)
+        self.states = states
+        if self._states_started:
+            for state in states:
+                if old_states.get(state.event) != new_states[state.event]:
+                    self._start_state(state)
+
+        old_binds = [self.base_webview.bindings[key] for key in self.bindings]
+        if [(b["event"], b["bind_event"], b["action"]) for b in old_binds] != [
+            (b["event"], b["bind_event"], b.get("action", CliOptions.SEND.value))
+            for b in binds
+        ]:
+            self._unload_binds()
+            self._load_binds(binds)
+
+        return self._apply_config_changes(old_config, config)
+
+    def _apply_config_changes(self, old: Config, new: Config) -> bool:
+        """Re-apply changed window settings. Returns True if the page reloaded."""
+        changed = {
+            field
+            for field in new.__fields__
+            if getattr(old, field) != getattr(new, field)
+        }
+        if "title" in changed:
+            super().set_title(new.title)
+        if changed & LAYER_SHELL_FIELDS:
+            self._reset_layer_shell()
+            self.configure_GTKLayerShell()
+        if "focus" in changed:
+            self.configure_focus(new.focus)
+        if changed & {"width", "height"}:
+            self.view.set_size_request(new.width or -1, new.height or -1)
+        if "transparency" in changed and new.transparency:
+            self.set_window_transparency()
+        if "devTool" in changed:
+            self.view.get_settings().set_property(
+                "enable-developer-extras", new.devTool
+            )
+        if changed & {"url", "syncDimension", "inputMask"}:
+            # these are applied while the page loads
+            self.view.load_uri(self._source_uri())
+            return True
+        return False
+
+    def _unload_binds(self):
+        for key in self.bindings:
+            try:
+                del self.base_webview.bindings[key]
+            except KeyError:
+                log_warning(f"Binding {key} not found in base_webview bindings.")
+        self.bindings = []
+        self.base_webview.refresh_binds()
+
     def _load_binds(self, binds_list):
         """Helper to register keybinds."""
         for bind in binds_list:
+            action = bind.get("action", CliOptions.SEND.value)
+            if action not in BIND_ACTIONS:
+                log_error(f"Unknown action '{action}' in bind {bind} of {self.name}.")
+                continue
             key = self.name + bind["event"]
             self.base_webview.bindings[key] = {
                 "widget": self.name,
                 "event": bind["event"],
                 "bind_event": bind["bind_event"],
+                "action": action,
             }
             self.bindings.append(key)
         self.base_webview.refresh_binds()
 
     def _setup_webview(self):
         """Initializes the WebKit2.WebView and its settings."""
-        self.view = WebKit2.WebView.new_with_related_view(self.base_webview.view)
+        self.view = self.base_webview.webview_pool.take()
         self.view.set_size_request(1024, 768)
 
         if self.config:
@@ -140,19 +371,20 @@ class WidgetWindow(Gtk.Window):
         settings.set_property("enable-offline-web-application-cache", False)
         settings.set_property("enable-developer-extras", self.config.devTool)
 
-        if self.config.url:
-            file_uri = self.config.url
-        else:
-            local_file_path = os.path.join(self.path, SOURCE_HTML)
-            if not os.path.exists(local_file_path):
-                log_error(f"File not found: {local_file_path}")
-                # We can probably just continue, it will load an error page
-            # file_uri = f"file://{os.path.abspath(local_file_path)}"
-            file_uri = f"weld://{local_file_path}"
-
+        file_uri = self._source_uri()
         log_info(f"Loading URI: {file_uri}")
         self.view.load_uri(file_uri)
 
+    def _source_uri(self) -> str:
+        if self.config.url:
+            return self.config.url
+        local_file_path = os.path.join(self.path, SOURCE_HTML)
+        if not os.path.exists(local_file_path):
+            log_error(f"File not found: {local_file_path}")
+            # We can probably just continue, it will load an error page
+        # file_uri = f"file://{os.path.abspath(local_file_path)}"
+        return f"weld://{local_file_path}"
+
     def _connect_signals_and_handlers(self):
         """Connects all Gtk signals and WebKit message handlers."""
         self.connect("destroy", self.close)
@@ -181,12 +413,28 @@ class WidgetWindow(Gtk.Window):
             self.connect("motion-notify-event", self.on_mouse_enter)
 
     def hide(self):
-        """Hide the window."""
-        self.view.hide()
+        """Hide the window. The page and its states keep running."""
+        if not self.get_visible():
+            return
+        super().hide()
+        self.dispatch_event("hide")
 
     def show(self):
-        """Show the window."""
+        """Show the window and dispatch `weld:show` on the page."""
         self.view.show()
+        super().show()
+        self.dispatch_event("show")
+
+    def toggle(self) -> bool:
+        """Show the window if it is hidden, hide it otherwise.
+        Returns:
+            bool: True if the window is now shown.
+        """
+        if self.get_visible():
+            self.hide()
+            return False
+        self.show()
+        return True
 
     def on_mouse_enter(self, widget, event):
         """Handle mouse enter event."""
@@ -264,8 +512,13 @@ class WidgetWindow(Gtk.Window):
 
     def after_load(self, view: WebKit2.WebView, load_event: WebKit2.LoadEvent):
         """Handle the load event of the WebView."""
+        if load_event == WebKit2.LoadEvent.STARTED:
+            self._page_loaded = False
+            self.outbox.hold()
         if load_event != WebKit2.LoadEvent.FINISHED:
             return
+        self._page_loaded = True
+        profiler.mark("first load finished", self.name)
         self.execute_script(f"window.name = '{self.name}';")
         t = f"""window.weld= (o) =>{{
             window.webkit.messageHandlers.{SCRIPT_MESSAGE_HANDLER}.postMessage(
@@ -277,7 +530,14 @@ class WidgetWindow(Gtk.Window):
         }};
         """
         self.execute_script(t)
-        self.state_callback()
+        self.execute_script(constants.STATE_JS)
+        # Replay cached values first so the page paints without waiting for
+        # scripts and services, which then refresh it in the background.
+        self.outbox.resync()
+        if self._states_started:
+            self.refresh_states()
+        else:
+            self.state_callback()
         if self.config.syncDimension:
             self.enable_dimension_sync()
         if self.config.inputMask:
@@ -285,6 +545,9 @@ class WidgetWindow(Gtk.Window):
             self.enable_input_masking()
         else:
             self.remove_input_mask()
+        queued, self._queued_events = self._queued_events, []
+        for event in queued:
+            self.dispatch_event(event)
 
     def configure_focus(self, type: str):
         match type:
@@ -311,7 +574,8 @@ class WidgetWindow(Gtk.Window):
             # this if is redundant but lsp complains about data being None without it
             log_error("No configuration data provided for GTK Layer Shell.")
             return
-        GtkLayerShell.init_for_window(self)
+        if not GtkLayerShell.is_layer_window(self):
+            GtkLayerShell.init_for_window(self)
 
         if data.layer:
             GtkLayerShell.set_layer(
@@ -351,13 +615,24 @@ class WidgetWindow(Gtk.Window):
         else:
             GtkLayerShell.set_exclusive_zone(self, -1)
 
+    def _reset_layer_shell(self):
+        """Drop anchors and margins before applying a changed config."""
+        for edge in (
+            GtkLayerShell.Edge.TOP,
+            GtkLayerShell.Edge.BOTTOM,
+            GtkLayerShell.Edge.LEFT,
+            GtkLayerShell.Edge.RIGHT,
+        ):
+            GtkLayerShell.set_anchor(self, edge, False)
+            GtkLayerShell.set_margin(self, edge, 0)
+
     def enable_input_masking(self):
         """Enable input masking for the WebView."""
-        self.execute_script(INPUT_MASK_JS)
+        self.execute_script(constants.INPUT_MASK_JS)
 
     def enable_dimension_sync(self):
         """Enable dimension sync for the WebView."""
-        self.execute_script(SYNC_DIMENSIONS_JS)
+        self.execute_script(constants.SYNC_DIMENSIONS_JS)
 
     def alert_frontend(self, message: str):
         """Send an alert message to the frontend."""
@@ -367,112 +642,179 @@ class WidgetWindow(Gtk.Window):
         self.execute_script(script)
 
     def state_callback(self):
+        """Start the runners of every state. Called once, on the first load."""
+        self._states_started = True
         for state in self.states:
-            set_state = self.get_set_state(state.event)
-            # set_state("testing")
-            match state.updateStrategy:
-                case UpdateStrategy.INTERVAL:
-                    if state.interval is None:
-                        log_error(
-                            f"Interval not set for {self.name} with update strategy INTERVAL"
-                        )
-                        continue
-                    interval_mil = state.interval
-                    interval_seconds = int(interval_mil / 1000)
-
-                    def run():
-                        # state.handler(run_cmd(state.script), set_state)
-                        if state.script:
-                            run_cmd_non_block(
-                                state.script, lambda res: state.handler(res, set_state)
-                            )
-                        else:
-                            log_warning(
-                                f"INTERVAL strategy for {self.name} but no script provided."
-                            )
+            self._start_state(state)
 
-                    self.interval_runners.append(set_interval(run, interval_seconds))
-                    log_info(
-                        f"Set interval for {self.name}: {interval_seconds} seconds"
+    def refresh_states(self):
+        """
+        Re-run ONCE scripts in the background after a page reload.
+        Every other runner is still alive and the page was already given
+        the cached values by the outbox.
+        """
+        for run in self.once_runners:
+            run()
+
+    def _start_state(self, state: State):
+        # everything that has to be undone to stop this state
+        stops = self.state_stops.setdefault(state.event, [])
+        set_state = self.get_set_state(state.event, state.uses_delta())
+        min_interval = state.min_update_interval()
+        if min_interval:
+            open_stream = set_state.open_stream
+            set_state, cancel = throttle(set_state, min_interval)
+            set_state.open_stream = open_stream
+            stops.append(cancel)
+        runner = None
+        if state.updateStrategy in [
+            UpdateStrategy.MANUAL,
+            UpdateStrategy.ONCE,
+            UpdateStrategy.INTERVAL,
+        ]:
+            runner = ScriptRunner(self.name, state, set_state)
+            self.script_runners.append(runner)
+            stops.append(runner.close)
+        match state.updateStrategy:
+            case UpdateStrategy.INTERVAL:
+                if state.interval is None:
+                    log_error(
+                        f"Interval not set for {self.name} with update strategy INTERVAL"
                     )
-                case UpdateStrategy.ONCE:
-                    # state.handler(run_cmd(state.script), set_state)
-                    if state.script:
-                        run_cmd_non_block(
-                            state.script, lambda res: state.handler(res, set_state)
-                        )
-                    else:
-                        log_warning(
-                            f"ONCE strategy for {self.name} but no script provided."
-                        )
-                case UpdateStrategy.CONTINOUS:
-
-                    def output_callback(data):
-                        state.handler(data, set_state)
-
-                    if state.script is None:
-                        log_error(
-                            f"Continuous strategy for {self.name} but no script provided."
-                        )
-                        continue
-                    else:
-                        self.processes.append(
-                            run_continuous_cmd(state.script, output_callback)
-                        )
-                        log_info(f"Set continous for {self.name}: {state.script}")
-                case UpdateStrategy.IPC:
-
-                    def output_callback(data):
-                        state.handler(data, set_state)
-
-                    socket_path = state.script
-                    self.processes.append(
-                        run_unix_socket_threaded(socket_path, output_callback)
+                    return
+                if not state.script:
+                    log_warning(
+                        f"INTERVAL strategy for {self.name} but no script provided."
                     )
-                    log_info(f"Set IPC (socket) for {self.name}: {socket_path}")
-                case UpdateStrategy.DBUS:
-                    log_info(
-                        f"Set IPC (dbus) for {self.name}: {state.script} not implemented"
+                    return
+                stops.append(
+                    scheduler.add(
+                        runner.run,
+                        state.interval,
+                        state.slackMs,
+                        name=runner.name,
                     )
-                case UpdateStrategy.SERVICE:
-                    if not state.service_factory:
-                        log_error(
-                            f"Strategy is SERVICE but 'service_factory' is missing for {state.event}"
-                        )
-                        continue
-                    try:
-                        instance = state.service_factory(
-                            set_state, state.service_arguments
-                        )
-                        stop_callback, handlers = instance.start()
-                        self.processes.append(stop_callback)
-                        self.processes.insert(0, stop_callback)  # stop first on close
-                        self.manual_states.update(handlers)
-                        if not stop_callback or not handlers:
-                            log_info(f"Started service {state.event}")
-                    except Exception as e:
-                        log_exception(f"Failed to start service {state.event}: {e}")
-            if state.updateStrategy in [
-                UpdateStrategy.MANUAL,
-                UpdateStrategy.ONCE,
-                UpdateStrategy.INTERVAL,
-            ]:
-
-                def state_callback(args: Optional[dict[str, str]] = {}):
-                    s = state.script
-                    if s is None:
-                        log_error(
-                            "state_callback: state.script is None, cannot run command."
+                )
+                log_info(f"Set interval for {self.name}: {state.interval} ms")
+            case UpdateStrategy.ONCE:
+                if state.script:
+                    runner.run()
+                    self.once_runners.append(runner.run)
+                else:
+                    log_warning(
+                        f"ONCE strategy for {self.name} but no script provided."
+                    )
+            case UpdateStrategy.CONTINOUS:
+                output_callback = self._lines_callback(state, set_state)
+                if state.script is None:
+                    log_error(
+                        f"Continuous strategy for {self.name} but no script provided."
+                    )
+                    return
+                else:
+                    stops.append(
+                        run_continuous_cmd(
+                            state.script, output_callback, self._batch_ms(state)
                         )
-                        return
-                    if args is None:
-                        args = {}
-                    for key, value in args.items():
-                        s = s.replace(f"{{{key}}}", value)
-
-                    run_cmd_non_block(s, lambda res: state.handler(res, set_state))
+                    )
+                    log_info(f"Set continous for {self.name}: {state.script}")
+            case UpdateStrategy.IPC:
+                if not state.script:
+                    log_error(f"IPC strategy for {self.name} but no socket provided.")
+                    return
+                socket_path = state.script
+                stops.append(
+                    self.base_webview.ipc.subscribe(
+                        socket_path,
+                        self._lines_callback(state, set_state),
+                        state.framing,
+                        state.routeKey,
+                        state.route,
+                        state.latestOnly,
+                        self._batch_ms(state),
+                    )
+                )
+                log_info(f"Set IPC (socket) for {self.name}: {socket_path}")
+            case UpdateStrategy.DBUS:
+                if state.dbus is None:
+                    log_error(f"DBUS strategy for {self.name} but no dbus provided.")
+                    return
+                watch = DBusWatch(
+                    state.dbus, lambda data: state.handler(data, set_state)
+                )
+                watch.start()
+                stops.append(watch.stop)
+                log_info(f"Set DBUS for {self.name}: {watch.name}")
+            case UpdateStrategy.FILE:
+                watch = FileWatch(
+                    os.path.join(self.path, os.path.expanduser(state.path)),
+                    lambda data: state.handler(data, set_state),
+                    state.interval,
+                    state.slackMs,
+                    name=f"{self.name}:{state.event}",
+                )
+                watch.start()
+                stops.append(watch.stop)
+            case UpdateStrategy.SERVICE:
+                if not state.service_factory:
+                    log_error(
+                        f"Strategy is SERVICE but 'service_factory' is missing for {state.event}"
+                    )
+                    return
+                try:
+                    factory = state.service_factory
+                    if isinstance(factory, str):
+                        factory = get_service(factory)
+                    release, handlers = self.base_webview.services.acquire(
+                        factory, state.service_arguments, set_state
+                    )
+                    stops.insert(0, release)  # stop first on close
+                    self.manual_states.update(handlers)
+                    stops.append(lambda: self._drop_handlers(handlers))
+                    log_info(f"Started service {state.event}")
+                except Exception as e:
+                    log_exception(f"Failed to start service {state.event}: {e}")
+        if runner is not None:
+
+            def state_callback(args: Optional[dict[str, str]] = {}):
+                runner.run(args, skip_if_running=False)
+
+            self.manual_states[state.event] = state_callback
+            stops.append(lambda: self._drop_handlers([state.event]))
+
+    def _stop_state(self, event: str):
+        """Stop everything `_start_state` started for `event`."""
+        for stop in self.state_stops.pop(event, []):
+            stop()
+        self.script_runners = [
+            runner for runner in self.script_runners if runner.state.event != event
+        ]
+        self.once_runners = [
+            run for run in self.once_runners if run.__self__.state.event != event
+        ]
+
+    def _drop_handlers(self, names):
+        for name in names:
+            self.manual_states.pop(name, None)
+
+    @staticmethod
+    def _batch_ms(state: State) -> int:
+        return STREAM_BATCH_MS if state.batchMs is None else state.batchMs
+
+    @staticmethod
+    def _lines_callback(state: State, set_state) -> Callable[[List[str]], None]:
+        """Handle a batch of streamed lines, per line for plain handlers."""
+        if state.batch_handler is not None:
+            return lambda lines: state.batch_handler(lines, set_state)
+
+        def per_line(lines: List[str]):
+            for line in lines:
+                try:
+                    state.handler(line, set_state)
+                except Exception as e:
+                    log_exception(f"Error in handler of {state.event}: {e}")
 
-                self.manual_states[state.event] = state_callback
+        return per_line
 
     def execute_script(self, script: str):
         """Execute a JavaScript script in the WebView."""
@@ -507,17 +849,26 @@ class WidgetWindow(Gtk.Window):
         self.set_app_paintable(True)
         self.view.set_background_color(Gdk.RGBA(0, 0, 0, 0))  # Transparent background
 
-    def close(self, widget: Gtk.Widget = None):
-        for cancel_runner in self.interval_runners:
-            cancel_runner()
-        for stop_process in self.processes:
-            stop_process()
-        for key in self.bindings:
-            try:
-                del self.base_webview.bindings[key]
-            except KeyError:
-                log_warning(f"Binding {key} not found in base_webview bindings.")
-        self.base_webview.refresh_binds()
+    def close(self, widget: Gtk.Widget = None, forget_state: bool = False):
+        """
+        Stop the states and destroy the window.
+
+        Args:
+            forget_state (bool): Drop the cached payloads too, for a widget
+                                 that is removed rather than restarted.
+        """
+        if forget_state:
+            self.base_webview.state_cache.pop(self.name, None)
+        self.outbox.close()
+        self.base_webview.streams.close_widget(self.name)
+        if self.reloader is not None:
+            self.reloader.stop()
+        # services first
+        for state in sorted(
+            self.states, key=lambda s: s.updateStrategy != UpdateStrategy.SERVICE
+        ):
+            self._stop_state(state.event)
+        self._unload_binds()
         try:
             manager = self.view.get_user_content_manager()
             if self.js_signal_id and manager.handler_is_connected(self.js_signal_id):
@@ -535,25 +886,35 @@ class WidgetWindow(Gtk.Window):
             )
         return False
 
-    def get_set_state(self, function: str):
+    def get_set_state(self, function: str, delta: bool = True):
         """
         Get state updater function.
+
+        The updater accepts any JSON serializable object, which is encoded
+        exactly once. JSON strings are still accepted for backwards
+        compatibility.
         Args:
             function (str): The name of the function to call.
+            delta (bool): Send only what changed since the previous payload.
         Returns:
             function: The function to call.
         """
 
-        def state_updater(data: str):
-            try:
-                data = json.loads(data)
-            except json.JSONDecodeError:
-                pass
-            script = f"""
-            window.dispatchEvent(new CustomEvent("weld:{function}",{json.dumps({"detail":data})}));
-            """
-            GLib.idle_add(self.execute_script, script)
-
+        def state_updater(data: Any):
+            # Strings are the original API: JSON text is decoded so the page
+            # receives an object, anything else is sent as a plain string.
+            if isinstance(data, (str, bytes)):
+                try:
+                    data = loads(data)
+                except ValueError:
+                    pass
+            self.outbox.push(function, data, delta)
+
+        # High-rate data can skip the script path entirely,
+        # see BaseWebView._on_stream_scheme_request.
+        state_updater.open_stream = lambda: self.base_webview.streams.channel(
+            self.name, function
+        )
         return state_updater
 
     def bind_event(self, event: str):
@@ -564,6 +925,13 @@ class WidgetWindow(Gtk.Window):
         """
         if self.name + event not in self.base_webview.bindings:
             return
+        self.dispatch_event(event)
+
+    def dispatch_event(self, event: str):
+        """Dispatch `weld:<event>` on the page, once it has loaded."""
+        if not self._page_loaded:
+            self._queued_events.append(event)
+            return
         s = f"""
             if(window.name === '{self.name}')
             window.dispatchEvent(new CustomEvent("weld:{event}"));
@@ -575,12 +943,29 @@ class BaseWebView(Gtk.Window):
     view: WebKit2.WebView
     socket_path: str
     widgets: dict[str, WidgetWindow]
+    state_cache: dict[str, dict[str, Any]]
+    streams: StreamHub
+    services: ServiceHub
+    ipc: IPCHub
+    webview_pool: WebViewPool
 
-    def __init__(self, no_ipc=False):
+    def __init__(self, no_ipc=False, watch=False, pool_size=None):
         super().__init__(title="Base WebView")
+        # Hot reload every widget, see WidgetReloader
+        self.watch = watch
         self.view = WebKit2.WebView()
-        self.view.get_context().register_uri_scheme(
-            "weld", self._on_weld_scheme_request, None
+        context = self.view.get_context()
+        context.register_uri_scheme("weld", self._on_weld_scheme_request, None)
+
+        self.streams = StreamHub()
+        self.services = ServiceHub()
+        self.ipc = IPCHub()
+        security_manager = context.get_security_manager()
+        security_manager.register_uri_scheme_as_secure(STREAM_SCHEME)
+        security_manager.register_uri_scheme_as_cors_enabled(STREAM_SCHEME)
+        context.register_uri_scheme(STREAM_SCHEME, self._on_stream_scheme_request, None)
+        self.webview_pool = WebViewPool(
+            self.view, WEBVIEW_POOL_SIZE if pool_size is None else pool_size
         )
 
         self.socket_path: str = SOCKET_PATH
@@ -589,6 +974,7 @@ class BaseWebView(Gtk.Window):
             self._setup_ipc_socket()
         self.widgets = {}
         self.bindings = {}
+        self.state_cache = {}
 
     def _on_weld_scheme_request(self, request, user_data=None):
         """
@@ -598,6 +984,8 @@ class BaseWebView(Gtk.Window):
         uri = request.get_uri()
         # path = request.get_path()
         path = uri[7:]  # 7 is len("weld://")
+        # drop the query, e.g. the cache buster of a hot-swapped stylesheet
+        path = path.split("?", 1)[0]
 
         # 1. Identify the WebView initiating the request
         initiating_webview = request.get_web_view()
@@ -652,6 +1040,22 @@ class BaseWebView(Gtk.Window):
                 )
             )
 
+    def _on_stream_scheme_request(self, request, user_data=None):
+        """Handles weld-stream://<widget>/<event> URI requests."""
+        initiating_webview = request.get_web_view()
+        for name, widget_window in self.widgets.items():
+            if widget_window.view == initiating_webview:
+                self.streams.handle_request(request, name)
+                return
+        log_warning(f"Stream request '{request.get_uri()}' from unknown source")
+        request.finish_error(
+            GLib.Error.new_literal(
+                Gio.io_error_quark(),
+                "Widget not found",
+                Gio.IOErrorEnum.NOT_FOUND,
+            )
+        )
+
     def _finish_request_with_file(self, request, file_path):
         """Helper to finish the request by reading a local file."""
         file = Gio.File.new_for_path(file_path)
@@ -681,6 +1085,15 @@ class BaseWebView(Gtk.Window):
             log_error(f"Failed to read file {file_path}: {e.message}")
             request.finish_error(e)
 
+    def restart_widget(self, name: str) -> bool:
+        """Close widget `name` if it is open and create it again, as visible."""
+        visible = True
+        if name in self.widgets:
+            visible = self.widgets[name].get_visible()
+            self.widgets[name].close()
+        WidgetWindow(name, self, visible=visible)
+        return False
+
     def refresh_binds(self):
         from weld.Hyprlang import convert_code_to_hyprlang
 
@@ -704,14 +1117,100 @@ class BaseWebView(Gtk.Window):
                 widget = self.bindings[key]["widget"]
                 event = self.bindings[key]["event"]
                 bind_event = self.bindings[key]["bind_event"]
+                action = self.bindings[key]["action"]
+                flag = "" if action == CliOptions.SEND else f"--{action} "
                 t += (
                     f"bind = '{', '.join(bind_event)}','exec',"
-                    + f"r\"\"\"{weld_sender_path} {widget} {event}\"\"\"\n"
+                    + f"r\"\"\"{weld_sender_path} {flag}{widget} {event}\"\"\"\n"
                 )
 
             f.write("# Auto generated by weld\n" + convert_code_to_hyprlang(t))
         run_detached_cmd("hyprctl reload")
 
+    def preload_widgets(self):
+        """
+        Create, hidden, every widget whose directory has a PRELOAD_FILE.
+
+        Only the marker is checked, no other config.py is executed. The
+        widgets are created one per low-priority idle callback once the main
+        loop runs, so the socket is served in between.
+        """
+        if not os.path.isdir(WIDGET_DIR):
+            return
+        names = [
+            name
+            for name in sorted(os.listdir(WIDGET_DIR))
+            if os.path.exists(os.path.join(WIDGET_DIR, name, PRELOAD_FILE))
+        ]
+
+        def preload_next():
+            while names:
+                name = names.pop(0)
+                if name not in self.widgets:
+                    log_info(f"Preloading {name}")
+                    WidgetWindow(name, self, visible=False)
+                    break
+            return bool(names)
+
+        if names:
+            GLib.idle_add(preload_next, priority=GLib.PRIORITY_LOW)
+
+    def set_visibility(
+        self, action: str, name: str, event: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Show, hide or toggle a widget, creating it if it is not loaded.
+        Args:
+            action (str): "show", "hide" or "toggle".
+            name (str): The widget.
+            event (str): Dispatched as `weld:<event>` when the widget is
+                         shown, once its page has loaded.
+        Returns:
+            str: The error, or None.
+        """
+        widget = self.widgets.get(name)
+        if widget is None:
+            if action == CliOptions.HIDE:
+                return f"Widget {name} not found."
+            # shown as soon as it is mapped, `event` waits for the page
+            WidgetWindow(name, self)
+            if name not in self.widgets:
+                return f"Widget {name} failed to load."
+            if event:
+                self.widgets[name].dispatch_event(event)
+            return None
+
+        match action:
+            case CliOptions.SHOW:
+                shown = True
+                if not widget.get_visible():
+                    widget.show()
+            case CliOptions.HIDE:
+                shown = False
+                widget.hide()
+            case _:
+                shown = widget.toggle()
+        if shown and event:
+            widget.dispatch_event(event)
+        return None
+
+    def stats_lines(self) -> list[str]:
+        """Runtime metrics, one `name: value` line each, for `weldctl stats`."""
+        lines = []
+        for key, value in executor.stats().items():
+            if isinstance(value, dict):
+                value = ", ".join(f"{k}={v}" for k, v in value.items()) or "-"
+            lines.append(f"executor.{key}: {value}")
+        values = ", ".join(f"{k}={v}" for k, v in self.webview_pool.stats().items())
+        lines.append(f"webview_pool: {values}")
+        for widget in self.widgets.values():
+            for runner in widget.script_runners:
+                values = ", ".join(f"{k}={v}" for k, v in runner.stats().items())
+                lines.append(f"state.{runner.name}: {values}")
+        for phase, elapsed in profiler.stats().items():
+            lines.append(f"startup.{phase}: {elapsed:.1f} ms")
+        return lines
+
     def _setup_ipc_socket(self):
         if os.path.exists(self.socket_path):
             os.remove(self.socket_path)
@@ -769,7 +1268,7 @@ class BaseWebView(Gtk.Window):
                         case CliOptions.REMOVE:
                             widget_name = message["widget"]
                             if widget_name in self.widgets:
-                                self.widgets[widget_name].close()
+                                self.widgets[widget_name].close(forget_state=True)
                                 response = json.dumps(
                                     {
                                         "status": "success",
@@ -786,9 +1285,7 @@ class BaseWebView(Gtk.Window):
 
                         case CliOptions.RESTART:
                             widget_name = message["widget"]
-                            if widget_name in self.widgets:
-                                self.widgets[widget_name].close()
-                            widget_window = WidgetWindow(widget_name, self)
+                            self.restart_widget(widget_name)
                             response = json.dumps(
                                 {
                                     "status": "success",
@@ -796,12 +1293,42 @@ class BaseWebView(Gtk.Window):
                                 }
                             )
 
+                        case CliOptions.SHOW | CliOptions.HIDE | CliOptions.TOGGLE:
+                            widget_name = message["widget"]
+                            error = self.set_visibility(
+                                message["action"],
+                                widget_name,
+                                message.get("bind_event"),
+                            )
+                            if error:
+                                response = json.dumps(
+                                    {"status": "error", "message": error}
+                                )
+                            else:
+                                response = json.dumps(
+                                    {"status": "success", "message": "OK"}
+                                )
+
                         case CliOptions.LIST_ACTIVE:
                             active_widgets = list(self.widgets.keys())
                             response = json.dumps(
                                 {"status": "success", "data": active_widgets}
                             )
 
+                        case CliOptions.SCHEDULE:
+                            wakeups = [
+                                f"+{delay:>9.1f} ms  {', '.join(names)}"
+                                for delay, names in scheduler.upcoming()
+                            ]
+                            response = json.dumps(
+                                {"status": "success", "data": wakeups}
+                            )
+
+                        case CliOptions.STATS:
+                            response = json.dumps(
+                                {"status": "success", "data": self.stats_lines()}
+                            )
+
                         case CliOptions.SEND:
                             widget_name = message["widget"]
                             if widget_name in self.widgets:
@@ -1,15 +1,41 @@
+"""
+GI namespaces, imported on first use.
+
+Loading a typelib is the expensive part of `from gi.repository import X`
+(WebKit2 alone pulls in most of the stack), so `from weld.gi_modules import
+GLib` only loads GLib. The versions are still declared up front, before
+anything can import a namespace with the wrong one.
+"""
+
+import importlib
+
 import gi
 
+from ..profiler import profiler
+
+VERSIONS = {
+    "GLib": "2.0",
+    "Gtk": "3.0",
+    "WebKit2": "4.1",
+    "GtkLayerShell": "0.1",
+    "Gdk": "3.0",
+    "Gio": "2.0",
+    "GObject": "2.0",
+    "Soup": "3.0",
+}
+
 # Declare all versions before importing
-gi.require_version("GLib", "2.0")
-gi.require_version("Gtk", "3.0")
-gi.require_version("WebKit2", "4.1")
-gi.require_version("GtkLayerShell", "0.1")
-gi.require_version("Gdk", "3.0")
-gi.require_version("Gio", "2.0")
-gi.require_version("GObject", "2.0")
-gi.require_version("Soup", "3.0")
-
-from gi.repository import Gdk, Gio, GLib, GObject, Gtk, GtkLayerShell, Soup, WebKit2
+for _namespace, _version in VERSIONS.items():
+    gi.require_version(_namespace, _version)
+
+
+def __getattr__(name: str):
+    if name in VERSIONS:
+        with profiler.span(f"gi {name}"):
+            module = importlib.import_module(f"gi.repository.{name}")
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = ["Gdk", "GLib", "Gtk", "GtkLayerShell", "WebKit2", "Gio", "GObject", "Soup"]
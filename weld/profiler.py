@@ -0,0 +1,101 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .log import log_info
+
+# Reported by `weld --profile-startup`, the last one ends the profile
+PHASES = (
+    "interpreter",
+    "imports",
+    "base view",
+    "first load finished",
+    "first state delivered",
+)
+
+_IMPORTED = time.perf_counter()
+
+
+def _process_age() -> float:
+    """Seconds since this process was started, 0 if /proc can't tell."""
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            raw = f.read()
+        # starttime, counted after the ")" closing comm
+        start_ticks = int(raw[raw.rfind(b")") + 2 :].split()[19])
+        uptime = time.clock_gettime(time.CLOCK_BOOTTIME)
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+class StartupProfiler:
+    """
+    Wall time of the startup phases, for `weld --profile-startup`.
+
+    Phases are marked once, as the time since the process was started, so
+    the interpreter start is included. Spans (config exec, typelib loads)
+    add up every time they run and are reported with the phases once the
+    first state has reached a page. Disabled, every call is a no-op.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._origin = 0.0
+        self._marks: List[Tuple[str, float, str]] = []
+        self._spans: Dict[str, List[float]] = {}
+
+    def enable(self):
+        self.enabled = True
+        self._origin = time.perf_counter() - _process_age()
+        self.mark("interpreter", at=_IMPORTED)
+
+    def mark(self, phase: str, detail: str = "", at: Optional[float] = None):
+        """Record the first time `phase` is reached."""
+        if not self.enabled or any(name == phase for name, _, _ in self._marks):
+            return
+        elapsed = (time.perf_counter() if at is None else at) - self._origin
+        self._marks.append((phase, elapsed, detail))
+        if phase == PHASES[-1]:
+            for line in self.report():
+                log_info(line)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Add the time spent in the block to `name`."""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            spent = time.perf_counter() - started
+            self._spans.setdefault(name, [0.0, 0])
+            self._spans[name][0] += spent
+            self._spans[name][1] += 1
+
+    def stats(self) -> Dict[str, float]:
+        """ms of every phase reached so far and of every span."""
+        values = {phase: elapsed * 1000 for phase, elapsed, _ in self._marks}
+        values.update((name, spent * 1000) for name, (spent, _) in self._spans.items())
+        return values
+
+    def report(self) -> List[str]:
+        """One line per phase and span, in ms."""
+        lines = ["Startup profile (ms since process start):"]
+        previous = 0.0
+        for phase, elapsed, detail in self._marks:
+            delta = (elapsed - previous) * 1000
+            line = f"  {phase:<24}{elapsed * 1000:8.1f}  (+{delta:.1f})"
+            lines.append(f"{line}  {detail}" if detail else line)
+            previous = elapsed
+        for name, (spent, count) in sorted(self._spans.items()):
+            lines.append(f"  {name:<24}{spent * 1000:8.1f}  in {count} run(s)")
+        return lines
+
+
+profiler = StartupProfiler()
+
+__all__ = ["StartupProfiler", "profiler", "PHASES"]
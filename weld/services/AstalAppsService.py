@@ -1,4 +1,3 @@
-import json
 import re
 import shlex
 import subprocess
@@ -35,7 +34,9 @@ class AstalAppsService(WeLDService):
     to launch properly using Astal.
     """
 
-    def __init__(self, setState: Callable[[str], None], arguments: AppsServiceArgs):
+    shared = False  # query results belong to the widget that asked
+
+    def __init__(self, setState: Callable[[Any], None], arguments: AppsServiceArgs):
         """Initialize the AstalAppsService."""
         super().__init__(setState)
         self.query_limit = arguments.get("queryLimit", 10)
@@ -155,14 +156,14 @@ class AstalAppsService(WeLDService):
         query_str = args.get("query", "").lower()
 
         if not query_str:
-            self._setState("[]")
+            self._setState([])
             return
 
         results = []
         try:
             with self.lock:
                 if not self.app_list:
-                    self._setState("[]")
+                    self._setState([])
                     return
 
                 for app in self.app_list:
@@ -174,11 +175,10 @@ class AstalAppsService(WeLDService):
                     if all(c in it for c in query_str):
                         results.append(app)
 
-            state_string = json.dumps(results)
-            self._setState(state_string)
+            self._setState(results)
         except Exception as e:
             log_error(f"AstalAppsService: Query failed for '{query_str}': {e}")
-            self._setState("[]")
+            self._setState([])
 
 
 __all__ = ["AstalAppsService", "AppsServiceArgs"]
@@ -1,5 +1,4 @@
 # AUTHENTICATION SERVICE (AstalAuth)
-import json
 from typing import Any, Callable, Dict, List, NotRequired, Optional, Tuple, TypedDict
 
 import gi
@@ -22,7 +21,9 @@ class AstalAuthService(WeLDService):
     Service to handle PAM authentication using AstalAuth.
     """
 
-    def __init__(self, setState: Callable[[str], None], arguments: AuthServiceArgs):
+    shared = False  # every widget runs its own PAM conversation
+
+    def __init__(self, setState: Callable[[Any], None], arguments: AuthServiceArgs):
         super().__init__(setState)
         self.arguments = arguments
 
@@ -153,8 +154,7 @@ class AstalAuthService(WeLDService):
         if self._stopped:
             return
         try:
-            payload = json.dumps({"status": status, "message": message})
-            self._setState(payload)
+            self._setState({"status": status, "message": message})
         except Exception as e:
             log_error(f"AstalAuthService: Failed to serialize state: {e}")
 
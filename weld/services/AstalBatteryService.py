@@ -1,5 +1,4 @@
 # BATTERY SERVICE (using Astal/Battery)
-import json
 import math
 from typing import (
     Any,
@@ -75,7 +74,9 @@ class AstalBatteryService(WeLDService):
     specified in the `arguments` dictionary for efficiency.
     """
 
-    def __init__(self, setState: Callable[[str], None], arguments: BatteryServiceArgs):
+    shared = True  # the battery is the same for every widget
+
+    def __init__(self, setState: Callable[[Any], None], arguments: BatteryServiceArgs):
         """Initialize the AstalBatteryService."""
         super().__init__(setState)
 
@@ -189,8 +190,7 @@ class AstalBatteryService(WeLDService):
                 state_dict[key] = None
 
         try:
-            state_string = json.dumps(state_dict)
-            self._setState(state_string)
+            self._setState(state_dict)
         except Exception as e:
             log_error(f"Failed to serialize battery state: {e}")
 
@@ -1,5 +1,4 @@
 # BLUETOOTH SERVICE 
-import json
 from typing import Any, Callable, Dict, List, NotRequired, Optional, Tuple, TypedDict
 
 import gi
@@ -22,8 +21,10 @@ class AstalBluetoothService(WeLDService):
     Supports Power, Scan, Pair, Trust, Block, Rename, and Connect.
     """
 
+    shared = True  # adapters and devices are system-wide
+
     def __init__(
-        self, setState: Callable[[str], None], arguments: BluetoothServiceArgs
+        self, setState: Callable[[Any], None], arguments: BluetoothServiceArgs
     ):
         super().__init__(setState)
         self.arguments = arguments
@@ -333,8 +334,7 @@ class AstalBluetoothService(WeLDService):
                 key=lambda x: (not x['connected'], not x['paired'], -x['rssi'])
             )
 
-            payload = json.dumps({"adapter": adapter_info, "devices": devices_list})
-            self._setState(payload)
+            self._setState({"adapter": adapter_info, "devices": devices_list})
         except Exception as e:
             log_error(f"AstalBluetooth: State push failed: {e}")
 
@@ -1,5 +1,4 @@
 # HYPRLAND SERVICE (using Astal/Hyprland)
-import json
 from typing import (
     Any,
     Callable,
@@ -159,7 +158,9 @@ class AstalHyprlandService(WeLDService):
     Service to monitor Hyprland status using AstalHyprland.
     """
 
-    def __init__(self, setState: Callable[[str], None], arguments: HyprlandServiceArgs):
+    shared = True  # one compositor, handlers only dispatch to it
+
+    def __init__(self, setState: Callable[[Any], None], arguments: HyprlandServiceArgs):
         """Initialize the AstalHyprlandService."""
         super().__init__(setState)
 
@@ -279,8 +280,7 @@ class AstalHyprlandService(WeLDService):
                 state_dict[key] = None
 
         try:
-            state_string = json.dumps(state_dict)
-            self._setState(state_string)
+            self._setState(state_dict)
         except Exception as e:
             log_error(f"Failed to serialize Hyprland state: {e}")
 
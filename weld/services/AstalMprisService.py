@@ -1,4 +1,3 @@
-import json
 from typing import Any, Callable, Dict, List, Optional, Tuple, TypedDict
 
 import gi
@@ -68,7 +67,9 @@ def serialize_player(player: AstalMpris.Player) -> Dict[str, Any]:
 
 
 class AstalMprisService(WeLDService):
-    def __init__(self, setState: Callable[[str], None], arguments: MprisServiceArgs):
+    shared = True  # players are session-wide
+
+    def __init__(self, setState: Callable[[Any], None], arguments: MprisServiceArgs):
         super().__init__(setState)
         self.first_run = True
         self.mpris: AstalMpris.Mpris = None  # type: ignore
@@ -217,7 +218,7 @@ class AstalMprisService(WeLDService):
                 players_list.append(serialize_player(p))
 
         try:
-            self._setState(json.dumps({"players": players_list}))
+            self._setState({"players": players_list})
         except Exception:
             pass
 
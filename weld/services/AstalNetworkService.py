@@ -1,4 +1,3 @@
-import json
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import gi
@@ -12,7 +11,9 @@ from gi.repository import AstalNetwork
 
 
 class AstalNetworkService(WeLDService):
-    def __init__(self, setState: Callable[[str], None], arguments: dict):
+    shared = True  # NetworkManager state is system-wide
+
+    def __init__(self, setState: Callable[[Any], None], arguments: dict):
         super().__init__(setState)
         self.nm = None
         self.is_ready = False
@@ -124,7 +125,7 @@ class AstalNetworkService(WeLDService):
                 ),
             }
 
-            self._setState(json.dumps(data))
+            self._setState(data)
         except Exception as e:
             log_error(f"Push State Fail: {e}")
         return False
@@ -1,4 +1,3 @@
-import json
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import gi
@@ -12,7 +11,9 @@ from gi.repository import AstalNotifd
 
 
 class AstalNotifdService(WeLDService):
-    def __init__(self, setState: Callable[[str], None], arguments: dict):
+    shared = True  # one notification daemon per session
+
+    def __init__(self, setState: Callable[[Any], None], arguments: dict):
         super().__init__(setState)
         self.notifd: AstalNotifd.Notifd = None  # type: ignore
         self._signal_ids = []
@@ -90,18 +91,16 @@ class AstalNotifdService(WeLDService):
             )
 
         self._setState(
-            json.dumps(
-                {
-                    "daemon": {
-                        "dontDisturb": self.notifd.get_dont_disturb(),
-                        "ignoreTimeout": self.notifd.get_ignore_timeout(),
-                        "defaultTimeout": self.notifd.get_default_timeout(),
-                    },
-                    "notifications": sorted(
-                        notifs_list, key=lambda x: x['time'], reverse=True
-                    ),
-                }
-            )
+            {
+                "daemon": {
+                    "dontDisturb": self.notifd.get_dont_disturb(),
+                    "ignoreTimeout": self.notifd.get_ignore_timeout(),
+                    "defaultTimeout": self.notifd.get_default_timeout(),
+                },
+                "notifications": sorted(
+                    notifs_list, key=lambda x: x['time'], reverse=True
+                ),
+            }
         )
         return False
 
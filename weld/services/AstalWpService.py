@@ -1,4 +1,3 @@
-import json
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import gi
@@ -12,7 +11,9 @@ from gi.repository import AstalWp
 
 
 class AstalWpService(WeLDService):
-    def __init__(self, setState: Callable[[str], None], arguments: dict):
+    shared = True  # one PipeWire graph per session
+
+    def __init__(self, setState: Callable[[Any], None], arguments: dict):
         super().__init__(setState)
         self.wp: AstalWp.Wp = None
         self._stopped = False
@@ -133,7 +134,7 @@ class AstalWpService(WeLDService):
                 "playback": [serialize_node(st) for st in audio.get_streams()],
                 "recording": [serialize_node(r) for r in audio.get_recorders()],
             }
-            self._setState(json.dumps(payload))
+            self._setState(payload)
         except Exception as e:
             log_error(f"Wp Push Error: {e}")
         return False
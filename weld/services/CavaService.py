@@ -1,7 +1,7 @@
 import os
 import subprocess
 import tempfile
-from typing import Callable, Dict, NotRequired, Optional, Tuple, TypedDict
+from typing import Any, Callable, Dict, NotRequired, Optional, Tuple, TypedDict
 
 from ..gi_modules import Gio, GLib, Soup, WebKit2
 from ..log import log_error, log_info
@@ -25,9 +25,11 @@ class CavaServiceArgs(TypedDict):
 
 
 class CavaService(WeLDService):
+    shared = False  # handlers reconfigure the process of the calling widget
+
     _active_instance: Optional['CavaService'] = None
 
-    def __init__(self, setState: Callable[[str], None], arguments: CavaServiceArgs):
+    def __init__(self, setState: Callable[[Any], None], arguments: CavaServiceArgs):
         super().__init__(setState)
         self.arguments = arguments
         self.process: Optional[subprocess.Popen] = None
@@ -0,0 +1,148 @@
+# CLOCK SERVICE (aligned to the wall clock)
+import locale
+import time
+from typing import Any, Callable, Dict, Literal, NotRequired, Optional, Tuple, TypedDict
+
+from ..gi_modules import Gio, GLib
+from ..log import log_error, log_info, log_warning
+from .base import WeLDService
+
+Precision = Literal["second", "minute"]
+
+DEFAULT_FORMATS: Dict[str, str] = {"time": "%H:%M", "date": "%a %d %b"}
+
+# strftime directives that change every second
+_SECOND_DIRECTIVES = ("%S", "%T", "%X", "%c", "%r", "%s", "%-S")
+
+LOCALTIME = "/etc/localtime"
+
+
+class ClockServiceArgs(TypedDict):
+    """
+    Configuration options for the ClockService.
+    - formats: Name -> strftime format, all sent in one payload.
+               Defaults to {"time": "%H:%M", "date": "%a %d %b"}.
+    - precision: "second" or "minute". Defaults to "second" if any format
+                 shows seconds, "minute" otherwise.
+    """
+
+    formats: NotRequired[Dict[str, str]]
+    precision: NotRequired[Precision]
+
+
+class ClockService(WeLDService):
+    """
+    Clock that ticks exactly when the displayed value changes.
+
+    Each tick is scheduled for the next second or minute boundary of the
+    wall clock, so it never drifts, and formatting happens in-process with
+    the user's LC_TIME. The clock catches up right after a resume (logind
+    PrepareForSleep) and after a timezone change (/etc/localtime).
+    """
+
+    shared = True  # the wall clock is the same for every widget
+
+    def __init__(self, setState: Callable[[Any], None], arguments: ClockServiceArgs):
+        super().__init__(setState)
+        self.formats = arguments.get("formats", DEFAULT_FORMATS)
+        precision = arguments.get("precision")
+        if precision is None:
+            shows_seconds = any(
+                directive in fmt
+                for fmt in self.formats.values()
+                for directive in _SECOND_DIRECTIVES
+            )
+            precision = "second" if shows_seconds else "minute"
+        self.unit = 1 if precision == "second" else 60
+        self._timeout_id: Optional[int] = None
+        self._system_bus: Optional[Gio.DBusConnection] = None
+        self._sleep_subscription: Optional[int] = None
+        self._cancellable = Gio.Cancellable()
+        self._tz_monitor: Optional[Gio.FileMonitor] = None
+
+    def start(self) -> Tuple[Callable[[], None], Dict[str, Callable]]:
+        log_info(f"Starting ClockService, ticking every {self.unit}s")
+        try:
+            locale.setlocale(locale.LC_TIME, "")
+        except locale.Error as e:
+            log_warning(f"ClockService: Using the C locale: {e}")
+
+        Gio.bus_get(Gio.BusType.SYSTEM, self._cancellable, self._on_system_bus)
+        self._tz_monitor = Gio.File.new_for_path(LOCALTIME).monitor_file(
+            Gio.FileMonitorFlags.WATCH_MOVES, None
+        )
+        self._tz_monitor.connect("changed", self._on_timezone_changed)
+
+        self._tick()
+        return (self._stop, {"Clock:sync": lambda _: self._tick()})
+
+    def _stop(self):
+        log_info("Stopping ClockService...")
+        self._cancellable.cancel()
+        if self._timeout_id is not None:
+            GLib.source_remove(self._timeout_id)
+            self._timeout_id = None
+        if self._sleep_subscription is not None:
+            self._system_bus.signal_unsubscribe(self._sleep_subscription)
+            self._sleep_subscription = None
+        if self._tz_monitor is not None:
+            self._tz_monitor.cancel()
+            self._tz_monitor = None
+
+    def _tick(self):
+        """Send the current time and schedule the next boundary."""
+        if self._timeout_id is not None:
+            GLib.source_remove(self._timeout_id)
+        now = time.time()
+        local = time.localtime(now)
+        payload: Dict[str, Any] = {
+            name: time.strftime(fmt, local) for name, fmt in self.formats.items()
+        }
+        payload["timestamp"] = int(now)
+        self._setState(payload)
+
+        # +1 ms so that a timer firing a hair early still lands past the edge
+        delay_ms = int((self.unit - now % self.unit) * 1000) + 1
+        self._timeout_id = GLib.timeout_add(delay_ms, self._on_timeout)
+
+    def _on_timeout(self):
+        self._timeout_id = None
+        self._tick()
+        return False
+
+    def _on_system_bus(self, _source, result: Gio.AsyncResult):
+        try:
+            self._system_bus = Gio.bus_get_finish(result)
+        except GLib.Error as e:
+            if not e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                log_error(f"ClockService: No system bus, can't follow resume: {e}")
+            return
+        self._sleep_subscription = self._system_bus.signal_subscribe(
+            "org.freedesktop.login1",
+            "org.freedesktop.login1.Manager",
+            "PrepareForSleep",
+            "/org/freedesktop/login1",
+            None,
+            Gio.DBusSignalFlags.NONE,
+            self._on_prepare_for_sleep,
+        )
+
+    def _on_prepare_for_sleep(self, _bus, _sender, _path, _iface, _signal, params):
+        (going_to_sleep,) = params.unpack()
+        if not going_to_sleep:
+            # the pending timeout did not advance while suspended
+            self._tick()
+
+    def _on_timezone_changed(self, _monitor, _file, _other, event):
+        if event in (
+            Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+            Gio.FileMonitorEvent.CREATED,
+            Gio.FileMonitorEvent.RENAMED,
+            Gio.FileMonitorEvent.MOVED_IN,
+        ):
+            time.tzset()
+            log_info("ClockService: Timezone changed.")
+            self._tick()
+
+
+__all__ = ["ClockService", "ClockServiceArgs"]
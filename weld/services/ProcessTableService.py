@@ -0,0 +1,228 @@
+# PROCESS TABLE SERVICE (walks /proc directly)
+import heapq
+import os
+import signal
+import time
+from array import array
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    NotRequired,
+    Optional,
+    Tuple,
+    TypedDict,
+)
+
+from ..log import log_error, log_info, log_warning
+from ..utils import executor, scheduler
+from .base import WeLDService
+
+SortKey = Literal["cpu", "memory"]
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+# Field positions in /proc/<pid>/stat, counted after the ")" closing comm
+_STATE, _UTIME, _STIME, _START, _RSS = 0, 11, 12, 19, 21
+
+
+class ProcessTableArgs(TypedDict):
+    """
+    Configuration options for the ProcessTableService.
+    - count: Number of processes in the table. Defaults to 10.
+    - interval: Sampling interval in ms. Defaults to 2000.
+    - sortBy: "cpu" or "memory". Defaults to "cpu".
+    """
+
+    count: NotRequired[int]
+    interval: NotRequired[int]
+    sortBy: NotRequired[SortKey]
+
+
+class _ProcessSlots:
+    """
+    Per-PID bookkeeping in flat arrays, so thousands of processes don't
+    cost thousands of objects. Slots of exited processes are reused.
+    """
+
+    def __init__(self):
+        self.index: Dict[int, int] = {}
+        self.start = array("Q")  # start time, tells a reused PID apart
+        self.jiffies = array("Q")  # utime + stime at the last sample
+        self.seen = array("L")  # generation of the last sample that saw it
+        self._free: List[int] = []
+
+    def get(self, pid: int, start: int, generation: int) -> Tuple[int, bool]:
+        """Return the slot of `pid` and whether it is new."""
+        slot = self.index.get(pid)
+        if slot is not None and self.start[slot] == start:
+            self.seen[slot] = generation
+            return slot, False
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = len(self.start)
+                self.start.append(0)
+                self.jiffies.append(0)
+                self.seen.append(0)
+            self.index[pid] = slot
+        self.start[slot] = start
+        self.jiffies[slot] = 0
+        self.seen[slot] = generation
+        return slot, True
+
+    def release_unseen(self, generation: int):
+        for pid, slot in list(self.index.items()):
+            if self.seen[slot] != generation:
+                del self.index[pid]
+                self._free.append(slot)
+
+
+def _read_stat(pid: int) -> Optional[Tuple[str, List[str]]]:
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as file:
+            raw = file.read()
+    except OSError:
+        return None  # exited in the meantime
+    open_paren, close_paren = raw.find(b"("), raw.rfind(b")")
+    name = raw[open_paren + 1 : close_paren].decode(errors="replace")
+    return name, raw[close_paren + 2 :].decode().split()
+
+
+class ProcessTableService(WeLDService):
+    """
+    Top-N process table without running `ps`.
+
+    Every sample walks /proc/<pid>/stat on the worker pool. CPU% is the
+    jiffy delta since the previous sample. The state is
+    {"processes": {pid: row}, "order": [pid, ...]}, keyed by PID so that the
+    delta layer only sends the rows that entered, left or changed.
+    """
+
+    shared = True  # the process table is system-wide
+
+    def __init__(self, setState: Callable[[Any], None], arguments: ProcessTableArgs):
+        super().__init__(setState)
+        self.count = arguments.get("count", 10)
+        self.interval = arguments.get("interval", 2000)
+        self.sort_by: SortKey = arguments.get("sortBy", "cpu")
+        if self.sort_by not in ("cpu", "memory"):
+            log_error(f"ProcessTableService: Unknown sortBy '{self.sort_by}'.")
+            self.sort_by = "cpu"
+        self._slots = _ProcessSlots()
+        self._generation = 0
+        self._last_sample = 0.0
+        self._in_flight = False
+        self._cancel: Optional[Callable[[], None]] = None
+
+    def start(self) -> Tuple[Callable[[], None], Dict[str, Callable]]:
+        log_info(f"Starting ProcessTableService, top {self.count} by {self.sort_by}")
+        self._cancel = scheduler.add(
+            self._refresh, self.interval, name="ProcessTableService"
+        )
+        self._refresh()
+        return (
+            self._stop,
+            {
+                "Process:kill": self._kill,
+                "Process:renice": self._renice,
+                "Process:sync": lambda _: self._refresh(),
+            },
+        )
+
+    def _stop(self):
+        log_info("Stopping ProcessTableService...")
+        if self._cancel is not None:
+            self._cancel()
+            self._cancel = None
+
+    def _refresh(self):
+        if self._in_flight:
+            return
+        self._in_flight = True
+        executor.submit(
+            self._sample,
+            self._publish,
+            "ProcessTableService",
+            on_error=lambda _: self._publish(None),
+        )
+
+    def _publish(self, rows: Optional[List[Dict[str, Any]]]):
+        self._in_flight = False
+        if rows is None or self._cancel is None:
+            return False
+        self._setState(
+            {
+                "processes": {str(row["pid"]): row for row in rows},
+                "order": [row["pid"] for row in rows],
+            }
+        )
+        return False
+
+    def _sample(self) -> List[Dict[str, Any]]:
+        """Walk /proc. Runs on a worker, touches nothing but the slots."""
+        now = time.monotonic()
+        elapsed = now - self._last_sample
+        self._last_sample = now
+        self._generation += 1
+        slots = self._slots
+
+        candidates = []
+        for entry in os.scandir("/proc"):
+            if not entry.name.isdigit():
+                continue
+            pid = int(entry.name)
+            stat = _read_stat(pid)
+            if stat is None:
+                continue
+            name, fields = stat
+            jiffies = int(fields[_UTIME]) + int(fields[_STIME])
+            slot, new = slots.get(pid, int(fields[_START]), self._generation)
+            previous = slots.jiffies[slot]
+            slots.jiffies[slot] = jiffies
+            cpu = 0.0 if new else (jiffies - previous) / CLOCK_TICKS / elapsed * 100
+            memory = int(fields[_RSS]) * PAGE_SIZE
+            candidates.append((cpu, memory, pid, name, fields[_STATE]))
+        slots.release_unseen(self._generation)
+
+        key_index = 0 if self.sort_by == "cpu" else 1
+        top = heapq.nlargest(self.count, candidates, key=lambda c: c[key_index])
+        return [
+            {
+                "pid": pid,
+                "name": name,
+                "cpu": round(cpu, 1),
+                "memory": memory,
+                "state": state,
+            }
+            for cpu, memory, pid, name, state in top
+        ]
+
+    def _kill(self, args: dict):
+        """Send a signal to a process. args: {"pid": int, "signal": "TERM"}"""
+        try:
+            pid = int(args["pid"])
+            sig = args.get("signal", "TERM")
+            if isinstance(sig, str):
+                sig = signal.Signals[sig if sig.startswith("SIG") else f"SIG{sig}"]
+            os.kill(pid, sig)
+            log_info(f"Sent {signal.Signals(sig).name} to {pid}")
+        except (KeyError, ValueError, OSError) as e:
+            log_warning(f"Process:kill {args} failed: {e}")
+        self._refresh()
+
+    def _renice(self, args: dict):
+        """Change the niceness of a process. args: {"pid": int, "nice": int}"""
+        try:
+            pid, nice = int(args["pid"]), int(args["nice"])
+            os.setpriority(os.PRIO_PROCESS, pid, nice)
+            log_info(f"Set niceness of {pid} to {nice}")
+        except (KeyError, ValueError, OSError) as e:
+            log_warning(f"Process:renice {args} failed: {e}")
+
+
+__all__ = ["ProcessTableService", "ProcessTableArgs"]
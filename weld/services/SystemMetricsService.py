@@ -0,0 +1,275 @@
+# SYSTEM METRICS SERVICE (reads /proc directly)
+import os
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    NotRequired,
+    Optional,
+    Tuple,
+    TypedDict,
+)
+
+from ..log import log_error, log_info
+from ..utils import scheduler
+from .base import WeLDService
+
+MetricKey = Literal["cpu", "memory", "network", "disk", "load"]
+
+# Sampling interval of every metric in milliseconds
+DEFAULT_RATES: Dict[MetricKey, int] = {
+    "cpu": 1000,
+    "memory": 2000,
+    "network": 1000,
+    "disk": 30000,
+    "load": 5000,
+}
+
+READ_SIZE = 65536
+# Reads of the same file closer together than this share one result,
+# aligned scheduler ticks of several widgets cost one read.
+SHARE_WINDOW = 0.1  # seconds
+
+
+class SystemMetricsArgs(TypedDict):
+    """
+    Configuration options for the SystemMetricsService.
+    - metrics: Metric name -> sampling interval in ms. Defaults to all
+               metrics at their default rates.
+    - disks: Mount points reported by the "disk" metric. Defaults to ["/"].
+    - interfaces: Interfaces counted by the "network" metric. Defaults to
+                  every interface except "lo".
+    """
+
+    metrics: NotRequired[Dict[MetricKey, int]]
+    disks: NotRequired[List[str]]
+    interfaces: NotRequired[List[str]]
+
+
+class ProcSampler:
+    """
+    Keeps /proc files open and re-reads them with pread.
+
+    Shared by every SystemMetricsService, so widgets sampling on the same
+    tick read each file once. A service that reads the cached text it has
+    already sampled keeps its previous rates. Main thread only.
+    """
+
+    def __init__(self):
+        self._fds: Dict[str, int] = {}
+        self._cache: Dict[str, Tuple[float, str]] = {}
+
+    def read(self, path: str) -> str:
+        now = time.monotonic()
+        cached = self._cache.get(path)
+        if cached and now - cached[0] < SHARE_WINDOW:
+            return cached[1]
+
+        fd = self._fds.get(path)
+        if fd is None:
+            fd = self._fds[path] = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+        chunks = []
+        offset = 0
+        while True:
+            chunk = os.pread(fd, READ_SIZE, offset)
+            chunks.append(chunk)
+            offset += len(chunk)
+            if len(chunk) < READ_SIZE:
+                break
+        text = b"".join(chunks).decode()
+        self._cache[path] = (now, text)
+        return text
+
+
+sampler = ProcSampler()
+
+
+def _cpu_times(stat: str) -> Dict[str, Tuple[int, int]]:
+    """(busy, total) jiffies of "cpu" and every "cpuN" line."""
+    times = {}
+    for line in stat.splitlines():
+        if not line.startswith("cpu"):
+            break
+        name, *fields = line.split()
+        values = [int(v) for v in fields[:8]]  # guest time is already in user
+        idle = values[3] + values[4]  # idle + iowait
+        total = sum(values)
+        times[name] = (total - idle, total)
+    return times
+
+
+def _usage(old: Tuple[int, int], new: Tuple[int, int]) -> float:
+    busy, total = new[0] - old[0], new[1] - old[1]
+    return round(busy / total * 100, 1) if total > 0 else 0.0
+
+
+def _net_bytes(dev: str) -> Dict[str, Tuple[int, int]]:
+    """(received, transmitted) bytes per interface."""
+    counters = {}
+    for line in dev.splitlines()[2:]:
+        name, _, data = line.partition(":")
+        fields = data.split()
+        counters[name.strip()] = (int(fields[0]), int(fields[8]))
+    return counters
+
+
+class SystemMetricsService(WeLDService):
+    """
+    CPU, memory, network and disk usage without spawning any process.
+
+    Every metric is sampled on the shared scheduler at its own rate, and
+    the state holds the latest value of each:
+    {"cpu": {...}, "memory": {...}, "network": {...}, "disk": {...},
+     "load": [...]}. Rates are computed from the previous sample.
+    """
+
+    shared = True  # every widget reads the same /proc
+
+    def __init__(self, setState: Callable[[Any], None], arguments: SystemMetricsArgs):
+        super().__init__(setState)
+        self.rates: Dict[MetricKey, int] = {}
+        for key, rate in (arguments.get("metrics") or DEFAULT_RATES).items():
+            if key in DEFAULT_RATES:
+                self.rates[key] = rate
+            else:
+                log_error(f"SystemMetricsService: Unknown metric '{key}'. Ignoring.")
+        self.disks = arguments.get("disks", ["/"])
+        self.interfaces: Optional[List[str]] = arguments.get("interfaces")
+        self._state: Dict[str, Any] = {}
+        self._cancels: List[Callable[[], None]] = []
+        self._cpu: Dict[str, Tuple[int, int]] = {}
+        self._net: Dict[str, Tuple[int, int]] = {}
+        self._net_time = 0.0
+        # Text of each /proc file the rates were last computed from
+        self._seen: Dict[str, str] = {}
+
+    def start(self) -> Tuple[Callable[[], None], Dict[str, Callable]]:
+        log_info(f"Starting SystemMetricsService: {self.rates}")
+        for key, rate in self.rates.items():
+            self._cancels.append(
+                scheduler.add(
+                    lambda key=key: self._update(key), rate, name=f"metrics:{key}"
+                )
+            )
+        self._sync()
+        return (self._stop, {"SystemMetrics:sync": lambda _: self._sync()})
+
+    def _stop(self):
+        log_info("Stopping SystemMetricsService...")
+        for cancel in self._cancels:
+            cancel()
+        self._cancels.clear()
+
+    def _sync(self):
+        for key in self.rates:
+            self._sample(key)
+        self._setState(dict(self._state))
+
+    def _update(self, key: MetricKey):
+        self._sample(key)
+        self._setState(dict(self._state))
+
+    def _sample(self, key: MetricKey):
+        try:
+            match key:
+                case "cpu":
+                    self._state["cpu"] = self._sample_cpu()
+                case "memory":
+                    self._state["memory"] = self._sample_memory()
+                case "network":
+                    self._state["network"] = self._sample_network()
+                case "disk":
+                    self._state["disk"] = self._sample_disk()
+                case "load":
+                    load = sampler.read("/proc/loadavg").split()[:3]
+                    self._state["load"] = [float(v) for v in load]
+        except (OSError, ValueError, IndexError) as e:
+            log_error(f"SystemMetricsService: Failed to sample {key}: {e}")
+
+    def _already_used(self, path: str, text: str) -> bool:
+        """Whether `text` is the cached read this service last sampled."""
+        used, self._seen[path] = self._seen.get(path), text
+        return used is text
+
+    def _sample_cpu(self) -> Dict[str, Any]:
+        stat = sampler.read("/proc/stat")
+        if self._already_used("/proc/stat", stat) and "cpu" in self._state:
+            # a zero length interval would report 0 % and reset the baseline
+            return self._state["cpu"]
+        times = _cpu_times(stat)
+        previous, self._cpu = self._cpu, times
+        if not previous:
+            return {"usage": 0.0, "cores": [0.0] * (len(times) - 1)}
+        return {
+            "usage": _usage(previous["cpu"], times["cpu"]),
+            "cores": [
+                _usage(previous.get(name, value), value)
+                for name, value in times.items()
+                if name != "cpu"
+            ],
+        }
+
+    def _sample_memory(self) -> Dict[str, Any]:
+        info = {}
+        for line in sampler.read("/proc/meminfo").splitlines():
+            name, _, value = line.partition(":")
+            info[name] = int(value.split()[0]) * 1024
+        total = info["MemTotal"]
+        available = info.get("MemAvailable", info["MemFree"])
+        swap_total = info.get("SwapTotal", 0)
+        return {
+            "total": total,
+            "used": total - available,
+            "available": available,
+            "percent": round((total - available) / total * 100, 1),
+            "swapTotal": swap_total,
+            "swapUsed": swap_total - info.get("SwapFree", 0),
+        }
+
+    def _sample_network(self) -> Dict[str, Any]:
+        dev = sampler.read("/proc/net/dev")
+        if self._already_used("/proc/net/dev", dev) and "network" in self._state:
+            return self._state["network"]
+        now = time.monotonic()
+        counters = _net_bytes(dev)
+        if self.interfaces is not None:
+            counters = {n: c for n, c in counters.items() if n in self.interfaces}
+        else:
+            counters.pop("lo", None)
+        previous, self._net = self._net, counters
+        elapsed, self._net_time = now - self._net_time, now
+
+        interfaces = {}
+        for name, (rx, tx) in counters.items():
+            old_rx, old_tx = previous.get(name, (rx, tx))
+            interfaces[name] = {
+                # counters restart when an interface comes back up
+                "rx": max(0, round((rx - old_rx) / elapsed)),
+                "tx": max(0, round((tx - old_tx) / elapsed)),
+            }
+        return {
+            "rx": sum(i["rx"] for i in interfaces.values()),
+            "tx": sum(i["tx"] for i in interfaces.values()),
+            "interfaces": interfaces,
+        }
+
+    def _sample_disk(self) -> Dict[str, Any]:
+        disks = {}
+        for mount in self.disks:
+            stat = os.statvfs(mount)
+            total = stat.f_blocks * stat.f_frsize
+            free = stat.f_bavail * stat.f_frsize
+            used = total - stat.f_bfree * stat.f_frsize
+            disks[mount] = {
+                "total": total,
+                "used": used,
+                "free": free,
+                "percent": round(used / (used + free) * 100, 1) if total else 0.0,
+            }
+        return disks
+
+
+__all__ = ["SystemMetricsService", "SystemMetricsArgs"]
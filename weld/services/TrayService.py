@@ -1,4 +1,3 @@
-import json
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from ..gi_modules import Gio, GLib, GObject, Gtk
@@ -7,7 +6,9 @@ from .base import WeLDService
 
 
 class TrayService(WeLDService):
-    def __init__(self, setState: Callable[[str], None], arguments: dict):
+    shared = True  # one tray watcher per session
+
+    def __init__(self, setState: Callable[[Any], None], arguments: dict):
         super().__init__(setState)
         self._stopped = False
         self._items: Dict[str, Dict] = {}
@@ -173,7 +174,7 @@ class TrayService(WeLDService):
                     }
                 )
 
-            self._setState(json.dumps({"items": payload}))
+            self._setState({"items": payload})
         except Exception as e:
             log_error(f"Tray Push Error: {e}")
         return False
@@ -1,14 +1,107 @@
-from .AstalAppsService import AstalAppsService
-from .AstalAuthService import AstalAuthService
-from .AstalBatteryService import AstalBatteryService
-from .AstalBluetoothService import AstalBluetoothService
-from .AstalHyprlandService import AstalHyprlandService
-from .AstalMprisService import AstalMprisService
+"""
+Services are imported on first use, so a config only pays for (and only
+needs the typelibs of) the services it uses.
+
+`from weld.services import AstalBatteryService` still works. A state can
+also name its service, `"service_factory": "AstalBatteryService"`.
+Third-party packages add services through the "weld.services" entry point
+group or with `register_service`.
+"""
+
+import importlib
+from importlib.metadata import entry_points
+from typing import Dict, List, Type, Union
+
 from .base import WeLDService
-from .CavaService import CavaService
+
+ENTRY_POINT_GROUP = "weld.services"
+
+# Built-in services: name -> module that defines it
+_BUILTIN: Dict[str, str] = {
+    "AstalAppsService": ".AstalAppsService",
+    "AstalAuthService": ".AstalAuthService",
+    "AstalBatteryService": ".AstalBatteryService",
+    "AstalBluetoothService": ".AstalBluetoothService",
+    "AstalHyprlandService": ".AstalHyprlandService",
+    "AstalMprisService": ".AstalMprisService",
+    "AstalNetworkService": ".AstalNetworkService",
+    "AstalNotifdService": ".AstalNotifdService",
+    "AstalWpService": ".AstalWpService",
+    "CavaService": ".CavaService",
+    "ClockService": ".ClockService",
+    "ProcessTableService": ".ProcessTableService",
+    "SystemMetricsService": ".SystemMetricsService",
+    "TrayService": ".TrayService",
+}
+
+# Registered services: name -> class, or "module:attribute" to import lazily
+_registry: Dict[str, Union[str, Type[WeLDService]]] = {}
+_entry_points_loaded = False
+
+
+def register_service(name: str, service: Union[str, Type[WeLDService]]):
+    """Make a service available by name.
+
+    Args:
+        name: Name used in `service_factory`.
+        service: The class, or "package.module:ClassName" to import it on
+                 first use.
+    """
+    _registry[name] = service
+
+
+def _load_entry_points():
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        _registry.setdefault(entry_point.name, entry_point.value)
+
+
+def get_service(name: str) -> Type[WeLDService]:
+    """Return the service called `name`, importing it if needed.
+
+    Raises:
+        KeyError: No such service.
+        ImportError: The service or one of its typelibs is missing.
+    """
+    if name not in _registry and name not in _BUILTIN:
+        _load_entry_points()
+    service = _registry.get(name)
+    if service is None:
+        if name not in _BUILTIN:
+            raise KeyError(f"Unknown service '{name}'")
+        module = importlib.import_module(_BUILTIN[name], __name__)
+        service = _registry[name] = getattr(module, name)
+    elif isinstance(service, str):
+        module_name, _, attribute = service.partition(":")
+        module = importlib.import_module(module_name)
+        service = _registry[name] = getattr(module, attribute or name)
+    return service
+
+
+def available_services() -> List[str]:
+    """Names of every known service, without importing any of them."""
+    _load_entry_points()
+    return sorted(set(_BUILTIN) | set(_registry))
+
+
+def __getattr__(name: str):
+    if name in _BUILTIN or name in _registry:
+        return get_service(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_BUILTIN))
+
 
 __all__ = [
     "WeLDService",
+    "register_service",
+    "get_service",
+    "available_services",
     "AstalBatteryService",
     "AstalAuthService",
     "AstalAppsService",
@@ -16,4 +109,7 @@ __all__ = [
     "AstalHyprlandService",
     "AstalMprisService",
     "CavaService",
+    "SystemMetricsService",
+    "ProcessTableService",
+    "ClockService",
 ]
@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Dict, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, Tuple
+
+if TYPE_CHECKING:
+    from ..core.stream import StreamChannel
 
 
 class WeLDService(ABC):
@@ -11,13 +14,20 @@ class WeLDService(ABC):
     I'm going to hate writing wrapper for all these =(
     """
 
-    def __init__(self, setState: Callable[[str], None]):
+    # Set to True if widgets using the service with the same arguments can
+    # share a single instance: its state and its handlers must not depend on
+    # the widget that calls them.
+    shared: bool = False
+
+    def __init__(self, setState: Callable[[Any], None]):
         """
         Called by WidgetWindow.
 
         :param setState: The thread-safe B->F (Python to JS) function.
                          Call this from any thread to send data to the frontend.
-                         Use this to update the widget state(s).
+                         Use this to update the widget state(s). Pass plain
+                         Python objects, they are serialized exactly once.
+                         JSON strings are still accepted.
         :param arguments: Additional arguments for user-defined things.
         """
 
@@ -37,5 +47,15 @@ class WeLDService(ABC):
         """
         pass
 
+    def open_stream(self) -> "StreamChannel":
+        """
+        Get the `weld-stream://<widget>/<event>` channel of this service.
+
+        Frames written to it bypass script evaluation, the page reads them
+        with `window.weldStream(event, onFrame)` or `fetch(uri).body`.
+        Use it for high-rate data, and setState for everything else.
+        """
+        return self._setState.open_stream()  # type: ignore[attr-defined]
+
 
 __all__ = ["WeLDService"]
@@ -10,6 +10,9 @@ __all__ = [
     "AnchorType",
     "LayerType",
     "UpdateStrategy",
+    "Framing",
+    "BusType",
+    "DBusSource",
     "JSMessage",
     "PayloadType",
     "ConfigureGTKLayerShellPayloadData",
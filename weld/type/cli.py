@@ -9,3 +9,9 @@ class CliOptions(str, Enum):
     RESTART = "restart"
     LIST_ACTIVE = "listactive"
     SEND = "send"
+    SCHEDULE = "schedule"
+    STATS = "stats"
+    VALIDATE = "validate"
+    SHOW = "show"
+    HIDE = "hide"
+    TOGGLE = "toggle"
@@ -42,6 +42,8 @@ class Config(BaseModel):
     transparency: Optional[bool] = False
     devTool: Optional[bool] = False
     allowedRoutes: Optional[List[Union[str, Callable[[str], bool]]]] = []
+    # Apply edits of the widget directory while it runs, like `weld --watch`
+    hotReload: Optional[bool] = False
 
 
 class UpdateStrategy(str, Enum):
@@ -52,18 +54,97 @@ class UpdateStrategy(str, Enum):
     IPC = "ipc"
     DBUS = "dbus"
     SERVICE = "service"
+    FILE = "file"
+
+
+class Framing(str, Enum):
+    LINE = "line"  # newline delimited text
+    LENGTH = "length"  # 4 byte big-endian size, then a UTF-8 payload
+
+
+class BusType(str, Enum):
+    SESSION = "session"
+    SYSTEM = "system"
+
+
+class DBusSource(BaseModel):
+    """Object watched by a DBUS state."""
+
+    bus: BusType = BusType.SESSION
+    name: str  # e.g. "org.freedesktop.UPower"
+    path: str  # e.g. "/org/freedesktop/UPower/devices/DisplayDevice"
+    interface: str  # e.g. "org.freedesktop.UPower.Device"
+    # Properties to keep in the cache, all of them if None.
+    properties: Optional[List[str]] = None
+    # Signals of the interface to forward, with their last arguments.
+    signals: List[str] = []
+    # Changes arriving within this window are sent as one update.
+    coalesceMs: int = Field(default=50, ge=0)
 
 
 class State(BaseModel):
     event: str
     updateStrategy: UpdateStrategy
-    interval: Optional[int] = None
-    script: Optional[str] = None
+    interval: Optional[int] = None  # milliseconds
+    # FILE: the file to read. `interval` sets the polling period where the
+    # kernel can't report changes, i.e. procfs and most sysfs attributes.
+    # Relative paths are relative to the widget directory.
+    path: Optional[str] = None
+    # How late an INTERVAL tick may run so it can share a wakeup with others.
+    slackMs: Optional[int] = None
+    # Kill the script's process group if a run takes longer than this.
+    # Defaults to COMMAND_TIMEOUT_MS.
+    timeoutMs: Optional[int] = Field(default=None, gt=0)
+    # A shell command, or an argv list that is run without a shell.
+    script: Optional[Union[str, List[str]]] = None
+    # Interpreter kept running to execute the script, e.g. "bash" or an argv
+    # list. Saves a fork and exec per run for fast INTERVAL states.
+    coprocess: Optional[Union[str, List[str]]] = None
     handler: Callable[[str, Callable[[str], None]], None] = Field(
         default=lambda data, setState: setState(data)
     )
-    service_factory: Optional[Callable] = None
+    # CONTINOUS and IPC: lines that arrive within this window are handled as
+    # one batch. 0 handles whatever a single read returned.
+    batchMs: Optional[int] = Field(default=None, ge=0)
+    # Called with each batch of lines. Without it `handler` runs per line.
+    batch_handler: Optional[Callable[[List[str], Callable[[str], None]], None]] = None
+    # IPC: states reading the same socket share one connection. With a
+    # `route`, a state only gets the JSON messages whose `routeKey` field
+    # equals it.
+    framing: Framing = Framing.LINE
+    routeKey: str = "event"
+    route: Optional[str] = None
+    # IPC: only handle the newest message of each batchMs window. This does
+    # not slow the producer down, older messages of the window are dropped.
+    latestOnly: bool = False
+    # DBUS: the object to watch. The handler gets
+    # {"properties": {...}, "signals": {name: {"args": [...], "count": n}}}.
+    dbus: Optional[DBusSource] = None
+    # A WeLDService class, or the name of one, see weld.services
+    service_factory: Optional[Union[Callable, str]] = None
     service_arguments: Optional[dict] = None
+    # Send patches against the previous payload and skip identical ones.
+    # Defaults to on, except for CONTINOUS and IPC where every line matters.
+    delta: Optional[bool] = None
+    # Bound how often updates reach the page. The first update of a burst is
+    # sent right away and the last one is always delivered.
+    maxRate: Optional[float] = Field(default=None, gt=0)  # updates per second
+    minIntervalMs: Optional[int] = Field(default=None, gt=0)
+
+    def min_update_interval(self) -> Optional[float]:
+        """Smallest allowed gap between two updates in ms, None if unbounded."""
+        limits = [self.minIntervalMs or 0]
+        if self.maxRate:
+            limits.append(1000 / self.maxRate)
+        return max(limits) or None
+
+    def uses_delta(self) -> bool:
+        if self.delta is not None:
+            return self.delta
+        return self.updateStrategy not in (
+            UpdateStrategy.CONTINOUS,
+            UpdateStrategy.IPC,
+        )
 
     @root_validator(pre=True)
     def check_interval_condition(cls, values):
@@ -74,4 +155,8 @@ class State(BaseModel):
             raise ValueError(
                 "Interval must be provided when updateStrategy is 'interval'."
             )
+        if update_strategy == "file" and not values.get("path"):
+            raise ValueError("path must be provided when updateStrategy is 'file'.")
+        if update_strategy == "dbus" and values.get("dbus") is None:
+            raise ValueError("dbus must be provided when updateStrategy is 'dbus'.")
         return values
@@ -1,17 +1,37 @@
 from .data_fetching import (
+    kill_process_group,
     run_cmd,
     run_cmd_non_block,
     run_continuous_cmd,
     run_detached_cmd,
+    run_unix_socket,
     run_unix_socket_threaded,
     set_interval,
 )
+from .coprocess import Coprocess
+from .executor import executor
+from .patch import diff
+from .scheduler import scheduler
+from .serialization import dumps, loads
+from .template import Command, CommandTemplate
+from .throttle import throttle
 
 __all__ = [
     "run_cmd",
     "run_continuous_cmd",
     "set_interval",
+    "run_unix_socket",
     "run_unix_socket_threaded",
     "run_detached_cmd",
     "run_cmd_non_block",
+    "kill_process_group",
+    "diff",
+    "dumps",
+    "loads",
+    "throttle",
+    "scheduler",
+    "executor",
+    "Command",
+    "CommandTemplate",
+    "Coprocess",
 ]
@@ -0,0 +1,149 @@
+import os
+import select
+import shlex
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from typing import List, Optional, Union
+
+from ..constants import TEXT_ENCODING
+from ..log import log_info, log_warning
+from .data_fetching import kill_process_group
+
+# Ends every answer, optionally followed by the exit status: "\x1e0\n"
+END_MARKER = b"\x1e"
+# Separates the output of a failed command from its error message
+ERROR_MARKER = "\x1f"
+
+SHELLS = {"sh", "bash", "dash", "zsh", "ksh", "ash"}
+# stdin of the command must not eat the following requests. Like run_cmd,
+# stderr is returned, instead of stdout, only when the command fails.
+_SHELL_REQUEST = (
+    "{{ {command}\n}} </dev/null 2>{stderr}; __weld_status=$?; "
+    "[ $__weld_status -eq 0 ] || {{ printf '\\037'; cat {stderr}; }}; "
+    "printf '\\036%d\\n' $__weld_status\n"
+)
+
+
+class Coprocess:
+    """
+    A long-lived interpreter that runs commands sent on its stdin.
+
+    Shells need no cooperation: each command is wrapped so that the shell
+    prints the end marker and the exit status after it. Any other program
+    must read one request per line and answer with its output followed by
+    `\\x1e`, an optional exit status and a newline. A failed request may put
+    its error message after a `\\x1f` in the output.
+
+    The interpreter is started on first use and restarted if it dies or a
+    request times out. Requests are serialized. Thread-safe.
+    """
+
+    def __init__(self, argv: Union[str, List[str]]):
+        self.argv = shlex.split(argv) if isinstance(argv, str) else list(argv)
+        self.is_shell = os.path.basename(self.argv[0]) in SHELLS
+        self.process: Optional[subprocess.Popen] = None
+        self._stderr_path: Optional[str] = None
+        self._buffer = b""
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> subprocess.Popen:
+        if self.process is not None and self.process.poll() is not None:
+            # close its pipes, reap it and whatever it left in its group
+            self._kill()
+        if self.process is None:
+            self.process = subprocess.Popen(
+                self.argv,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                start_new_session=True,
+            )
+            self._buffer = b""
+            if self.is_shell and self._stderr_path is None:
+                fd, self._stderr_path = tempfile.mkstemp(prefix="weld-coprocess-")
+                os.close(fd)
+            log_info(f"Started coprocess {self.argv} (pid {self.process.pid})")
+        return self.process
+
+    def request(self, command: str, timeout: Optional[float] = None) -> str:
+        """Run `command` and return its output, "Error: ..." if it failed.
+
+        Raises:
+            subprocess.TimeoutExpired: No answer within `timeout` seconds.
+                                       The interpreter has been killed.
+        """
+        with self._lock:
+            process = self._ensure_started()
+            if self.is_shell:
+                payload = _SHELL_REQUEST.format(
+                    command=command, stderr=shlex.quote(self._stderr_path)
+                )
+            else:
+                payload = command.replace("\n", " ") + "\n"
+            try:
+                process.stdin.write(payload.encode(TEXT_ENCODING))
+                process.stdin.flush()
+            except OSError as e:
+                self._kill()
+                return f"Error: coprocess is gone ({e})"
+            return self._read_answer(command, timeout)
+
+    def _read_answer(self, command: str, timeout: Optional[float]) -> str:
+        fd = self.process.stdout.fileno()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            end = self._buffer.find(END_MARKER)
+            newline = self._buffer.find(b"\n", end) if end >= 0 else -1
+            if newline >= 0:
+                output = self._buffer[:end].decode(TEXT_ENCODING, "replace")
+                status = self._buffer[end + 1 : newline].strip()
+                self._buffer = self._buffer[newline + 1 :]
+                output, _, errors = output.partition(ERROR_MARKER)
+                if status and status != b"0":
+                    return f"Error: {errors or output}"
+                return output
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                self._kill()
+                raise subprocess.TimeoutExpired(command, timeout)
+            readable, _, _ = select.select([fd], [], [], remaining)
+            if not readable:
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                log_warning(f"Coprocess {self.argv} exited")
+                self._kill()
+                return "Error: coprocess exited"
+            self._buffer += chunk
+
+    def _kill(self):
+        if self.process is not None:
+            kill_process_group(self.process)
+            self.process = None
+        self._buffer = b""
+        if self._stderr_path is not None:
+            try:
+                os.remove(self._stderr_path)
+            except OSError:
+                pass
+            self._stderr_path = None
+
+    def close(self):
+        """Stop the interpreter without waiting for a running request."""
+        if self._lock.acquire(blocking=False):
+            try:
+                self._kill()
+            finally:
+                self._lock.release()
+        elif self.process is not None:
+            # the pending request sees EOF and cleans up
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+
+__all__ = ["Coprocess"]
@@ -1,28 +1,37 @@
-import socket
+import os
+import signal
 import subprocess
-import threading
-from typing import Callable
+from typing import Callable, List, Optional, Union
 
-from ..gi_modules import GLib, Gtk, WebKit2
+from ..gi_modules import Gio, GLib
 
-from ..constants import SOCKET_PATH, TEXT_ENCODING
+from ..constants import COMMAND_TIMEOUT_MS, SOCKET_PATH, TEXT_ENCODING
+from ..log import log_error, log_exception, log_info
+from .executor import executor
+from .scheduler import scheduler
 
+READ_CHUNK_SIZE = 65536
+MAX_LINE_SIZE = 16 * 1024 * 1024
 
-def run_cmd_non_block(cmd: str, callback: Callable[[str], None]) -> None:
-    """Run a command asynchronously and call the callback with output."""
 
-    def task():
-        try:
-            result = subprocess.run(
-                cmd, shell=True, check=True, capture_output=True, text=True
-            )
-            output = result.stdout
-        except subprocess.CalledProcessError as e:
-            output = f"Error: {e.stderr}"
+def run_cmd_non_block(
+    cmd: Union[str, List[str]], callback: Callable[[str], None], owner: str = ""
+) -> None:
+    """Run a command on the shared worker pool and call the callback with output.
+
+    Args:
+        cmd (str | list): The command to run.
+        callback: Called on the main loop with the output or error message.
+        owner (str): Queue the command is fair-shared under, e.g. the widget.
+    """
 
-        GLib.idle_add(callback, output)
+    def task() -> str:
+        try:
+            return run_cmd(cmd, COMMAND_TIMEOUT_MS / 1000)
+        except subprocess.TimeoutExpired:
+            return f"Error: timed out after {COMMAND_TIMEOUT_MS} ms"
 
-    threading.Thread(target=task, daemon=True).start()
+    executor.submit(task, callback, owner)
 
 
 def set_interval(func, interval_seconds):
@@ -31,116 +40,258 @@ def set_interval(func, interval_seconds):
     Returns:
         A function to cancel the interval.
     """
+    return scheduler.add(func, interval_seconds * 1000)
 
-    def wrapper():
-        func()  # Execute the function
-        return True  # Return True to keep the timer active
-
-    # Register the timeout
-    source_id = GLib.timeout_add_seconds(interval_seconds, wrapper)
 
-    # Return a function to cancel the interval
-    def cancel():
-        GLib.source_remove(source_id)
-
-    return cancel
-
-
-def run_cmd(cmd: str) -> str:
-    """Run a command in the shell.
+def run_cmd(cmd: Union[str, List[str]], timeout: Optional[float] = None) -> str:
+    """Run a command in the shell, or directly if given an argv list.
     Args:
-        cmd (str): The command to run.
+        cmd (str | list): The command to run.
+        timeout (float): Seconds to wait before killing the command.
     Returns:
         str: The output of the command. Result or error message.
+    Raises:
+        subprocess.TimeoutExpired: The command outlived `timeout`. Its whole
+                                   process group has been killed.
     """
+    process = subprocess.Popen(
+        cmd,
+        shell=isinstance(cmd, str),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace",  # a stray byte must not lose the whole output
+        start_new_session=True,  # own process group, killable as a whole
+    )
     try:
-        result = subprocess.run(
-            cmd, shell=True, check=True, capture_output=True, text=True
-        )
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        return f"Error: {e.stderr}"
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        kill_process_group(process)
+        raise
+    if process.returncode != 0:
+        return f"Error: {stderr}"
+    return stdout
 
 
-def run_continuous_cmd(cmd: str, callback):
-    """Run command in background thread and stream output line-by-line."""
+def kill_process_group(process: subprocess.Popen):
+    """SIGKILL a process started with start_new_session and all its children."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    # children that left the group may keep the pipes open, don't read them
+    for pipe in (process.stdin, process.stdout, process.stderr):
+        if pipe:
+            pipe.close()
+    process.wait()
 
-    process = None
 
-    def worker():
-        nonlocal process
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            shell=True,
-            text=True,
-            bufsize=1,
+class _LineReader:
+    """
+    Read a Gio stream in chunks on the main loop and hand out its lines.
+
+    Lines that arrive within `batch_ms` of the first pending one are
+    delivered together, so a burst costs one callback instead of hundreds.
+    With `batch_ms` 0 the lines of every read are delivered right away.
+    A line longer than `MAX_LINE_SIZE` is dropped.
+    """
+
+    def __init__(
+        self,
+        stream: Gio.InputStream,
+        on_lines: Callable[[List[str]], None],
+        on_end: Callable[[Optional[GLib.Error]], None],
+        cancellable: Gio.Cancellable,
+        batch_ms: int = 0,
+    ):
+        self.stream = stream
+        self.on_lines = on_lines
+        self.on_end = on_end
+        self.cancellable = cancellable
+        self.batch_ms = batch_ms
+        self._partial = b""
+        # inside a line that is too long, dropped up to its newline
+        self._skipping = False
+        self._pending: List[str] = []
+        self._source_id: Optional[int] = None
+
+    def start(self):
+        self.stream.read_bytes_async(
+            READ_CHUNK_SIZE, GLib.PRIORITY_DEFAULT, self.cancellable, self._on_read
         )
 
-        # Reading lines from the process
-        for line in process.stdout:
-            GLib.idle_add(callback, line.strip())
+    def _on_read(self, stream: Gio.InputStream, result: Gio.AsyncResult):
+        try:
+            data = stream.read_bytes_finish(result).get_data()
+        except GLib.Error as e:
+            if not e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                self._flush()
+                self.on_end(e)
+            return
+        if not data:
+            if self._partial and not self._skipping:
+                self._pending.append(self._decode(self._partial))
+                self._partial = b""
+            self._flush()
+            self.on_end(None)
+            return
+        *lines, self._partial = (self._partial + data).split(b"\n")
+        if self._skipping and lines:
+            del lines[0]
+            self._skipping = False
+        if self._skipping or len(self._partial) > MAX_LINE_SIZE:
+            if not self._skipping:
+                log_error("Error: stream line exceeds the size limit, dropped")
+            self._skipping = True
+            self._partial = b""
+        self._pending.extend(self._decode(line) for line in lines)
+        # read on before delivering, the pipe must keep draining
+        self.start()
+        if self.batch_ms <= 0:
+            self._flush()
+        elif self._pending and self._source_id is None:
+            self._source_id = GLib.timeout_add(self.batch_ms, self._on_timeout)
+
+    @staticmethod
+    def _decode(line: bytes) -> str:
+        return line.decode(TEXT_ENCODING, "replace").strip()
+
+    def _on_timeout(self):
+        self._source_id = None
+        if not self.cancellable.is_cancelled():
+            self._flush()
+        return False
 
-        # Wait for process to exit
-        process.stdout.close()
-        process.wait()
+    def _flush(self):
+        if self._source_id is not None:
+            GLib.source_remove(self._source_id)
+            self._source_id = None
+        if self._pending:
+            lines, self._pending = self._pending, []
+            try:
+                self.on_lines(lines)
+            except Exception as e:
+                log_exception(f"Error: line handler failed: {e}")
 
-        # Notify callback of exit
-        GLib.idle_add(callback, f"[Process exited with code {process.returncode}]")
 
-    def stop():
-        """Stop the process and clean up."""
-        if process:
-            process.terminate()  # Send SIGTERM to gracefully terminate the process
-            process.wait()  # Ensure process is fully terminated
-            print("Process terminated.")
+def _line_delivery(callback, batch_ms: Optional[int]):
+    """Adapt `callback` to batches. Without `batch_ms` it gets single lines."""
+    if batch_ms is None:
 
-    # Start the worker thread
-    threading.Thread(target=worker, daemon=True).start()
+        def per_line(lines: List[str]):
+            for line in lines:
+                try:
+                    callback(line)
+                except Exception as e:
+                    log_exception(f"Error: line handler failed: {e}")
+
+        return per_line, 0
+    return callback, batch_ms
+
+
+def run_continuous_cmd(
+    cmd: Union[str, List[str]], callback, batch_ms: Optional[int] = None
+):
+    """Run command and stream its output line-by-line to the callback.
+    An argv list is run without a shell. Everything happens on the main loop.
+
+    Args:
+        batch_ms (int): If given, the callback receives lists of the lines
+                        that arrived within this many milliseconds.
+    Returns:
+        A function that stops the process without waiting for it.
+    """
+    argv = ["/bin/sh", "-c", cmd] if isinstance(cmd, str) else list(cmd)
+    on_lines, batch_ms = _line_delivery(callback, batch_ms)
+    cancellable = Gio.Cancellable()
+    try:
+        process = Gio.Subprocess.new(
+            argv,
+            Gio.SubprocessFlags.STDOUT_PIPE | Gio.SubprocessFlags.STDERR_MERGE,
+        )
+    except GLib.Error as e:
+        log_error(f"Failed to start {cmd}: {e.message}")
+        return lambda: None
+
+    def on_exit(process: Gio.Subprocess, result: Gio.AsyncResult):
+        try:
+            process.wait_finish(result)
+        except GLib.Error:
+            return  # cancelled
+        if process.get_if_exited():
+            code = process.get_exit_status()
+        else:
+            code = -process.get_term_sig()
+        on_lines([f"[Process exited with code {code}]"])
+
+    def on_end(error: Optional[GLib.Error]):
+        if error is not None:
+            log_error(f"Reading output of {cmd} failed: {error.message}")
+        process.wait_async(cancellable, on_exit)
+
+    _LineReader(
+        process.get_stdout_pipe(), on_lines, on_end, cancellable, batch_ms
+    ).start()
+
+    def stop():
+        """Stop the process. GLib reaps it once it is gone."""
+        cancellable.cancel()
+        process.send_signal(signal.SIGTERM)
+        log_info(f"Process {process.get_identifier()} terminated.")
 
     return stop
 
 
-def run_unix_socket_threaded(socket_path, callback):
-    """Connect to a UNIX domain socket and read messages in a background thread."""
-    stop_event = threading.Event()
+def run_unix_socket(socket_path, callback, batch_ms: Optional[int] = None):
+    """Connect to a UNIX domain socket and stream its messages line-by-line.
+    Everything happens on the main loop.
 
-    def worker():
+    Args:
+        batch_ms (int): If given, the callback receives lists of lines,
+                        as in `run_continuous_cmd`.
+    Returns:
+        A function to close the connection.
+    """
+    on_lines, batch_ms = _line_delivery(callback, batch_ms)
+    cancellable = Gio.Cancellable()
+    connection: Optional[Gio.SocketConnection] = None
+
+    def on_end(error: Optional[GLib.Error]):
+        if error is not None:
+            on_lines([f"[Socket error: {error.message}]"])
+        if connection is not None:
+            connection.close(None)
+        on_lines(["[Socket closed]"])
+
+    def on_connect(client: Gio.SocketClient, result: Gio.AsyncResult):
+        nonlocal connection
         try:
-            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-            sock.connect(socket_path)
-            sock_file = sock.makefile("r")  # Line-buffered reading
-
-            while not stop_event.is_set():
-                line = sock_file.readline()
-                if not line:
-                    break
-                GLib.idle_add(callback, line.strip())
-
-        except Exception as e:
-            GLib.idle_add(callback, f"[Socket error: {e}]")
-        finally:
-            try:
-                sock_file.close()
-                sock.close()
-            except:
-                pass
-            GLib.idle_add(callback, "[Socket closed]")
+            connection = client.connect_finish(result)
+        except GLib.Error as e:
+            if not e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                on_end(e)
+            return
+        reader = _LineReader(
+            connection.get_input_stream(), on_lines, on_end, cancellable, batch_ms
+        )
+        reader.start()
 
-    thread = threading.Thread(target=worker, daemon=True)
-    thread.start()
+    Gio.SocketClient().connect_async(
+        Gio.UnixSocketAddress.new(socket_path), cancellable, on_connect
+    )
 
     def stop():
-        stop_event.set()
-        try:
-            sock.shutdown(socket.SHUT_RDWR)
-        except Exception as e:
-            GLib.idle_add(callback, f"[Socket shutdown error: {e}]")
+        cancellable.cancel()
+        if connection is not None and not connection.is_closed():
+            connection.close(None)
 
     return stop
 
 
+# Old name, kept for configs that import it. No thread is involved anymore.
+run_unix_socket_threaded = run_unix_socket
+
+
 def run_detached_cmd(cmd: str):
     """Run a command in the background, fully detached from the parent process.
 
@@ -166,9 +317,11 @@ def run_detached_cmd(cmd: str):
 
 
 __all__ = [
+    "kill_process_group",
     "set_interval",
     "run_cmd",
     "run_continuous_cmd",
+    "run_unix_socket",
     "run_unix_socket_threaded",
     "run_detached_cmd",
     "run_cmd_non_block",
@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from ..gi_modules import GLib
+from ..log import log_exception
+
+MAX_WORKERS = 4
+
+# Tasks of one owner that may run at once, keeps a worker free for the others
+MAX_PER_OWNER = MAX_WORKERS - 1
+
+_Task = Tuple[
+    Callable[[], Any],
+    Optional[Callable[[Any], None]],
+    Optional[Callable[[Exception], None]],
+    float,
+]
+
+
+class CommandExecutor:
+    """
+    Bounded pool of worker threads for blocking work such as commands.
+
+    Tasks are queued per owner (usually the widget name) and owners are
+    served round-robin, so one widget with many slow states can't starve
+    the others. An owner never runs more than `max_per_owner` tasks at
+    once, so even hung tasks of one widget leave workers for the rest.
+    Workers are started on demand up to `max_workers` and then reused.
+    Callbacks run on the GTK main loop.
+    """
+
+    def __init__(
+        self, max_workers: int = MAX_WORKERS, max_per_owner: int = MAX_PER_OWNER
+    ):
+        self.max_workers = max_workers
+        self.max_per_owner = max(1, min(max_per_owner, max_workers))
+        self._queues: "OrderedDict[str, Deque[_Task]]" = OrderedDict()
+        self._running: Dict[str, int] = {}
+        self._cond = threading.Condition()
+        self._workers = 0
+        self._idle = 0
+        self._submitted = 0
+        self._completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+        self._run_max = 0.0
+
+    def submit(
+        self,
+        task: Callable[[], Any],
+        callback: Optional[Callable[[Any], None]] = None,
+        owner: str = "",
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ):
+        """
+        Queue `task`, then call `callback` with its result on the main loop.
+        If `task` raises, the exception is logged and `on_error` is called
+        with it instead, so callers can clear their in-flight guards.
+        """
+        with self._cond:
+            self._queues.setdefault(owner, deque()).append(
+                (task, callback, on_error, time.monotonic())
+            )
+            self._submitted += 1
+            if self._idle == 0 and self._workers < self.max_workers:
+                self._workers += 1
+                threading.Thread(
+                    target=self._worker, name="weld-worker", daemon=True
+                ).start()
+            else:
+                self._cond.notify()
+
+    def _next(self) -> Tuple[str, _Task]:
+        """Pop the next task, rotating between owners. Lock must be held."""
+        while True:
+            for owner, queue in self._queues.items():
+                if self._running.get(owner, 0) < self.max_per_owner:
+                    break
+            else:
+                self._idle += 1
+                self._cond.wait()
+                self._idle -= 1
+                continue
+            task = queue.popleft()
+            del self._queues[owner]
+            if queue:
+                self._queues[owner] = queue  # back of the line
+            self._running[owner] = self._running.get(owner, 0) + 1
+            return owner, task
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                owner, (task, callback, on_error, queued_at) = self._next()
+            started = time.monotonic()
+            try:
+                result = task()
+            except Exception as e:
+                log_exception(f"Worker task failed: {e}")
+                result, callback = e, on_error
+            finished = time.monotonic()
+            with self._cond:
+                self._running[owner] -= 1
+                if not self._running[owner]:
+                    del self._running[owner]
+                if self._queues:
+                    self._cond.notify()  # a capped owner may be runnable now
+                wait, run = started - queued_at, finished - started
+                self._completed += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+                self._run_total += run
+                self._run_max = max(self._run_max, run)
+            if callback is not None:
+                GLib.idle_add(callback, result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, worker usage and wait/run times in milliseconds."""
+        with self._cond:
+            done = self._completed or 1
+            return {
+                "workers": self._workers,
+                "busy": self._workers - self._idle,
+                "queued": sum(len(q) for q in self._queues.values()),
+                "queued_by_owner": {o: len(q) for o, q in self._queues.items()},
+                "running_by_owner": dict(self._running),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "wait_avg_ms": round(self._wait_total / done * 1000, 2),
+                "wait_max_ms": round(self._wait_max * 1000, 2),
+                "run_avg_ms": round(self._run_total / done * 1000, 2),
+                "run_max_ms": round(self._run_max * 1000, 2),
+            }
+
+
+executor = CommandExecutor()
+
+__all__ = ["CommandExecutor", "executor"]
@@ -0,0 +1,62 @@
+from typing import Any, List, Union
+
+PathKey = Union[str, int]
+Operation = list  # [op, path, value?] where op is "add", "remove" or "replace"
+
+
+def diff(old: Any, new: Any) -> List[Operation]:
+    """Compute a JSON-Patch-like list of operations turning `old` into `new`.
+
+    Paths are lists of keys/indices instead of JSON pointers so nothing has to
+    be escaped. An empty list means both values are identical.
+
+    Args:
+        old: The previously sent payload.
+        new: The payload about to be sent.
+    Returns:
+        list: Operations in the form `[op, path]` or `[op, path, value]`.
+    """
+    ops: List[Operation] = []
+    _diff(old, new, [], ops)
+    return ops
+
+
+def _diff(old: Any, new: Any, path: List[PathKey], ops: List[Operation]):
+    # bool is an int subclass and True == 1, compare exact types first
+    if type(old) is not type(new):
+        ops.append(["replace", path, new])
+        return
+
+    if isinstance(new, dict):
+        sub: List[Operation] = []
+        for key in old:
+            if key not in new:
+                sub.append(["remove", path + [key]])
+        for key, value in new.items():
+            if key not in old:
+                sub.append(["add", path + [key], value])
+            else:
+                _diff(old[key], value, path + [key], sub)
+    elif isinstance(new, list):
+        sub = []
+        common = min(len(old), len(new))
+        for i in range(common):
+            _diff(old[i], new[i], path + [i], sub)
+        for i in range(common, len(new)):
+            sub.append(["add", path + [i], new[i]])
+        # remove from the back so earlier indices stay valid
+        for i in range(len(old) - 1, common - 1, -1):
+            sub.append(["remove", path + [i]])
+    else:
+        if old != new:
+            ops.append(["replace", path, new])
+        return
+
+    # A container where nearly everything changed is cheaper to resend whole.
+    if len(sub) > max(1, len(new)):
+        ops.append(["replace", path, new])
+    else:
+        ops.extend(sub)
+
+
+__all__ = ["diff"]
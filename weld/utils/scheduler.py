@@ -0,0 +1,154 @@
+import math
+from typing import Callable, List, Optional, Tuple
+
+from ..gi_modules import GLib
+from ..log import log_exception
+
+DEFAULT_SLACK_MS = 50
+
+
+class _Job:
+    __slots__ = ("callback", "interval", "slack", "deadline", "name")
+
+    def __init__(self, callback, interval: int, slack: int, deadline: int, name):
+        self.callback = callback
+        self.interval = interval  # all times in microseconds
+        self.slack = slack
+        self.deadline = deadline
+        self.name = name
+
+
+def _wake_time(jobs) -> Optional[int]:
+    """Pick the wakeup that runs the most jobs without running any too late.
+
+    Every job may run anywhere in [deadline, deadline + slack]. Waking at the
+    latest deadline that is still inside the earliest closing window runs
+    all overlapping jobs together.
+    """
+    if not jobs:
+        return None
+    closes = min(job.deadline + job.slack for job in jobs)
+    return max(job.deadline for job in jobs if job.deadline <= closes)
+
+
+class Scheduler:
+    """
+    Single timer for every periodic task of the daemon.
+
+    Intervals are in milliseconds. Deadlines are aligned to multiples of the
+    interval on the monotonic clock, so tasks with the same (or a multiple)
+    period tick together in every widget, and each task's slack lets nearby
+    deadlines share one wakeup. Must be used from the main thread.
+    """
+
+    def __init__(self, default_slack_ms: int = DEFAULT_SLACK_MS):
+        self.default_slack_ms = default_slack_ms
+        self._jobs: List[_Job] = []
+        self._source_id: Optional[int] = None
+        self._wake_at: Optional[int] = None
+        self._running = False
+
+    def add(
+        self,
+        callback: Callable[[], None],
+        interval_ms: int,
+        slack_ms: Optional[int] = None,
+        name: Optional[str] = None,
+    ) -> Callable[[], None]:
+        """Run `callback` every `interval_ms` milliseconds.
+
+        Args:
+            callback: Function to call.
+            interval_ms: Period in milliseconds.
+            slack_ms: How late the callback may run to share a wakeup with
+                      other tasks. Defaults to `default_slack_ms`, capped to
+                      a quarter of the interval.
+            name: Label shown in the schedule.
+        Returns:
+            A function to cancel the task.
+        """
+        interval = max(1, int(interval_ms)) * 1000
+        if slack_ms is None:
+            slack = min(self.default_slack_ms * 1000, interval // 4)
+        else:
+            slack = max(0, int(slack_ms)) * 1000
+        now = GLib.get_monotonic_time()
+        deadline = (now // interval + 1) * interval
+        job = _Job(callback, interval, slack, deadline, name or repr(callback))
+        self._jobs.append(job)
+        self._rearm()
+
+        def cancel():
+            if job in self._jobs:
+                self._jobs.remove(job)
+                self._rearm()
+
+        return cancel
+
+    def _rearm(self):
+        if self._running:
+            return
+        wake = _wake_time(self._jobs)
+        if wake == self._wake_at:
+            return
+        if self._source_id is not None:
+            GLib.source_remove(self._source_id)
+            self._source_id = None
+        self._wake_at = wake
+        if wake is None:
+            return
+        delay = max(0, wake - GLib.get_monotonic_time())
+        self._source_id = GLib.timeout_add(math.ceil(delay / 1000), self._on_wake)
+
+    def _on_wake(self):
+        self._source_id = None
+        self._wake_at = None
+        now = GLib.get_monotonic_time()
+        # timeouts have millisecond resolution, allow 1 ms of early wakeup
+        due_before = max(now + 1000, _wake_time(self._jobs) or 0)
+        self._running = True
+        try:
+            for job in list(self._jobs):
+                if job.deadline > due_before or job not in self._jobs:
+                    continue
+                # skip missed ticks but keep the alignment
+                job.deadline += (max(now - job.deadline, 0) // job.interval + 1) * (
+                    job.interval
+                )
+                try:
+                    job.callback()
+                except Exception as e:
+                    log_exception(f"Scheduled task {job.name} failed: {e}")
+        finally:
+            self._running = False
+        self._rearm()
+        return False
+
+    def upcoming(self, count: int = 10) -> List[Tuple[float, List[str]]]:
+        """Predict the next `count` wakeups.
+
+        Returns:
+            list: (milliseconds from now, names of the tasks run) pairs.
+        """
+        now = GLib.get_monotonic_time()
+        jobs = [
+            _Job(None, job.interval, job.slack, job.deadline, job.name)
+            for job in self._jobs
+        ]
+        result = []
+        for _ in range(count):
+            wake = _wake_time(jobs)
+            if wake is None:
+                break
+            names = []
+            for job in jobs:
+                if job.deadline <= wake:
+                    names.append(job.name)
+                    job.deadline += job.interval
+            result.append((round((wake - now) / 1000, 1), names))
+        return result
+
+
+scheduler = Scheduler()
+
+__all__ = ["Scheduler", "scheduler"]
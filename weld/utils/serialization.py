@@ -0,0 +1,31 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # optional fast backend
+    orjson = None
+
+
+def dumps(data: Any) -> str:
+    """Serialize `data` to a JSON string.
+
+    Uses orjson when it is installed and falls back to the standard library
+    for anything orjson refuses to encode.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass
+    return json.dumps(data)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse a JSON string. Raises ValueError on invalid input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+__all__ = ["dumps", "loads"]
@@ -0,0 +1,66 @@
+import re
+import shlex
+from typing import Dict, List, Optional, Tuple, Union
+
+Command = Union[str, List[str]]
+
+_PLACEHOLDER = re.compile(r"\{([^{}]+)\}")
+
+# literal text, or the key of a placeholder
+_Segment = Tuple[bool, str]
+
+
+def _compile(text: str) -> List[_Segment]:
+    segments: List[_Segment] = []
+    position = 0
+    for match in _PLACEHOLDER.finditer(text):
+        if match.start() > position:
+            segments.append((False, text[position : match.start()]))
+        segments.append((True, match.group(1)))
+        position = match.end()
+    if position < len(text):
+        segments.append((False, text[position:]))
+    return segments
+
+
+def _render(segments: List[_Segment], args: Dict[str, str], quote: bool) -> str:
+    parts = []
+    for is_key, value in segments:
+        if not is_key:
+            parts.append(value)
+        elif value in args:
+            parts.append(shlex.quote(str(args[value])) if quote else str(args[value]))
+        else:
+            parts.append(f"{{{value}}}")
+    return "".join(parts)
+
+
+class CommandTemplate:
+    """A command with `{key}` placeholders, parsed once.
+
+    The command is either a shell string, in which case values are
+    shell-quoted and placeholders must not be quoted again, or an argv list,
+    in which case every argument is a template of its own and values are
+    passed as they are. Placeholders without a matching argument are left
+    as they are.
+    """
+
+    def __init__(self, command: Command):
+        self.command = command
+        if isinstance(command, str):
+            self._segments: Optional[List[List[_Segment]]] = [_compile(command)]
+        else:
+            self._segments = [_compile(arg) for arg in command]
+        if not any(is_key for arg in self._segments for is_key, _ in arg):
+            self._segments = None  # nothing to substitute
+
+    def render(self, args: Optional[Dict[str, str]] = None) -> Command:
+        """Fill in the placeholders found in `args`."""
+        if not args or self._segments is None:
+            return self.command
+        if isinstance(self.command, str):
+            return _render(self._segments[0], args, quote=True)
+        return [_render(arg, args, quote=False) for arg in self._segments]
+
+
+__all__ = ["Command", "CommandTemplate"]
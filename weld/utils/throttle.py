@@ -0,0 +1,62 @@
+import threading
+import time
+from typing import Any, Callable, Tuple
+
+from ..gi_modules import GLib
+
+_UNSET = object()
+
+
+def throttle(
+    func: Callable[[Any], None], interval_ms: float
+) -> Tuple[Callable[[Any], None], Callable[[], None]]:
+    """Limit `func` to one call every `interval_ms` milliseconds.
+
+    The first call of a burst goes through immediately (leading edge). Later
+    calls inside the window only replace the pending value, which is
+    delivered when the window ends (trailing edge), so the last value always
+    arrives. Safe to call from any thread.
+
+    Returns:
+        A tuple of (throttled function, cancel function).
+    """
+    interval = interval_ms / 1000
+    lock = threading.Lock()
+    last_call = float("-inf")
+    pending: Any = _UNSET
+    source_id = None
+
+    def fire():
+        nonlocal last_call, pending, source_id
+        with lock:
+            data, pending = pending, _UNSET
+            source_id = None
+            last_call = time.monotonic()
+        if data is not _UNSET:
+            func(data)
+        return False
+
+    def throttled(data: Any):
+        nonlocal last_call, pending, source_id
+        with lock:
+            wait = last_call + interval - time.monotonic()
+            if wait > 0 or source_id is not None:
+                pending = data
+                if source_id is None:
+                    source_id = GLib.timeout_add(max(1, round(wait * 1000)), fire)
+                return
+            last_call = time.monotonic()
+        func(data)
+
+    def cancel():
+        nonlocal pending, source_id
+        with lock:
+            pending = _UNSET
+            if source_id is not None:
+                GLib.source_remove(source_id)
+                source_id = None
+
+    return throttled, cancel
+
+
+__all__ = ["throttle"]
@@ -0,0 +1,13 @@
+(paths) => {
+	// Re-fetch the stylesheets loaded from `paths`, the page keeps its state.
+	const stamp = Date.now();
+	let matched = false;
+	for (const link of document.querySelectorAll('link[rel="stylesheet"]')) {
+		const url = new URL(link.href);
+		if (!paths.includes(decodeURIComponent(url.pathname))) continue;
+		url.searchParams.set("weldReload", stamp);
+		link.href = url.href;
+		matched = true;
+	}
+	if (!matched) location.reload();
+}
@@ -0,0 +1,82 @@
+// Keeps the last value of every weld:<event> and applies patches sent by WeLD.
+// Patched values are copied along the changed path, so listeners always get
+// a new object and unchanged branches keep their identity.
+(() => {
+	if (window.weldState) return;
+
+	const values = {};
+
+	function dispatch(event, value) {
+		window.dispatchEvent(
+			new CustomEvent(`weld:${event}`, { detail: value }),
+		);
+	}
+
+	function applyPatch(root, ops) {
+		const fresh = new WeakSet();
+		const own = (container) => {
+			if (fresh.has(container)) return container;
+			const copy = Array.isArray(container)
+				? container.slice()
+				: { ...container };
+			fresh.add(copy);
+			return copy;
+		};
+
+		for (const [op, path, value] of ops) {
+			if (path.length === 0) {
+				root = op === "remove" ? undefined : value;
+				continue;
+			}
+			root = own(root);
+			let parent = root;
+			for (let i = 0; i < path.length - 1; i++) {
+				const child = own(parent[path[i]]);
+				parent[path[i]] = child;
+				parent = child;
+			}
+			const key = path[path.length - 1];
+			if (Array.isArray(parent)) {
+				if (op === "add") parent.splice(key, 0, value);
+				else if (op === "remove") parent.splice(key, 1);
+				else parent[key] = value;
+			} else if (op === "remove") {
+				delete parent[key];
+			} else {
+				parent[key] = value;
+			}
+		}
+		return root;
+	}
+
+	window.weldState = {
+		values,
+		set(event, value) {
+			values[event] = value;
+			dispatch(event, value);
+		},
+		patch(event, ops) {
+			values[event] = applyPatch(values[event], ops);
+			dispatch(event, values[event]);
+		},
+	};
+
+	// Read weld-stream://<widget>/<event> and call onFrame for every line.
+	window.weldStream = async (event, onFrame) => {
+		const response = await fetch(`weld-stream://${window.name}/${event}`);
+		const reader = response.body
+			.pipeThrough(new TextDecoderStream())
+			.getReader();
+		let buffer = "";
+		for (;;) {
+			const { value, done } = await reader.read();
+			if (done) break;
+			buffer += value;
+			let end;
+			while ((end = buffer.indexOf("\n")) >= 0) {
+				onFrame(buffer.slice(0, end));
+				buffer = buffer.slice(end + 1);
+			}
+		}
+	};
+})();